@@ -6,6 +6,7 @@ from django.db import transaction
 from PIL import Image
 
 from students.models import Student
+from applications.derivatives import apply_passport_derivatives, discard_derivatives
 from applications.models import IDApplication
 from idcards.models import IDCard
 from idcards.services import ensure_id_card_exists
@@ -148,10 +149,13 @@ def apply_id_view(request):
                         pass
 
                 application.passport = passport
+                replaced = apply_passport_derivatives(application, passport)
                 application.status = IDApplication.STATUS_PENDING
                 application.reviewed_by = ""
                 application.save()
 
+            discard_derivatives(replaced)
+
         except Exception:
             messages.error(request, "Upload failed. Try again.")
             return redirect("accounts:apply")
@@ -1,8 +1,16 @@
+from django.conf import settings
 from django.contrib import admin, messages
+from django.core.exceptions import PermissionDenied
 from django.db import transaction
+from django.http import Http404, HttpResponse
+from django.urls import path, reverse
+from django.utils.cache import patch_cache_control
+from django.utils.html import format_html
 
+from .derivatives import apply_passport_derivatives, discard_derivatives
 from .models import IDApplication
 from accounts.admin_mixins import RoleRestrictedAdminMixin
+from idcards.generator import PREVIEW_CACHE_SECONDS, render_card_preview
 from idcards.services import generate_id_card
 
 
@@ -88,9 +96,11 @@ class IDApplicationAdmin(RoleRestrictedAdminMixin, admin.ModelAdmin):
     allowed_roles = ["ADMIN", "REVIEWER", "APPROVER"]
 
     list_display = (
+        "passport_thumbnail",
         "student",
         "status",
         "created_at",
+        "card_preview_link",
     )
 
     list_filter = ("status",)
@@ -106,11 +116,15 @@ class IDApplicationAdmin(RoleRestrictedAdminMixin, admin.ModelAdmin):
     readonly_fields = (
         "created_at",
         "reviewed_by",
+        "passport_preview",
+        "card_preview",
     )
 
     fields = (
         "student",
         "passport",
+        "passport_preview",
+        "card_preview",
         "status",
         "reviewed_by",
         "created_at",
@@ -118,11 +132,82 @@ class IDApplicationAdmin(RoleRestrictedAdminMixin, admin.ModelAdmin):
 
     actions = [approve_application]
 
+    # ==================================================
+    # PASSPORT PREVIEWS (STORED DERIVATIVES, NOT ORIGINALS)
+    # ==================================================
+    @admin.display(description="Photo")
+    def passport_thumbnail(self, obj):
+        passport = obj.review_passport
+        if not passport:
+            return "-"
+        return format_html('<img src="{}" width="44" height="52" alt="">', passport.url)
+
+    @admin.display(description="Card photo")
+    def passport_preview(self, obj):
+        passport = obj.card_passport
+        if not passport:
+            return "-"
+        return format_html('<img src="{}" width="220" height="260" alt="">', passport.url)
+
+    # ==================================================
+    # CARD PREVIEW (REDUCED RESOLUTION, NO UPLOAD)
+    # ==================================================
+    def get_urls(self):
+        preview = path(
+            "<path:object_id>/card-preview/",
+            self.admin_site.admin_view(self.card_preview_view, cacheable=True),
+            name="applications_idapplication_card_preview",
+        )
+        return [preview, *super().get_urls()]
+
+    def card_preview_view(self, request, object_id):
+        obj = self.get_object(request, object_id)
+
+        if obj is None:
+            raise Http404("Application not found")
+        if not self.has_view_permission(request, obj):
+            raise PermissionDenied
+
+        data = render_card_preview(obj)
+        if not data:
+            raise Http404("No passport to preview")
+
+        response = HttpResponse(data, content_type="image/jpeg")
+        patch_cache_control(
+            response,
+            private=True,
+            max_age=int(getattr(settings, "IDCARD_PREVIEW_CACHE_SECONDS", PREVIEW_CACHE_SECONDS)),
+        )
+        return response
+
+    def _card_preview_url(self, obj):
+        return reverse("admin:applications_idapplication_card_preview", args=[obj.pk])
+
+    @admin.display(description="Card preview")
+    def card_preview(self, obj):
+        if not obj or not obj.pk or not obj.passport:
+            return "-"
+        return format_html(
+            '<img src="{}" width="505" height="320" loading="lazy" alt="Card preview">',
+            self._card_preview_url(obj),
+        )
+
+    @admin.display(description="Card")
+    def card_preview_link(self, obj):
+        if not obj.passport:
+            return "-"
+        return format_html('<a href="{}" target="_blank">Preview</a>', self._card_preview_url(obj))
+
     # ==================================================
     # SELF-HEAL: Generate ID when admin edits manually
     # ==================================================
     def save_model(self, request, obj, form, change):
+        replaced = []
+        if "passport" in form.changed_data and obj.passport:
+            replaced = apply_passport_derivatives(obj, form.cleaned_data["passport"])
+
         super().save_model(request, obj, form, change)
+        discard_derivatives(replaced)
 
         # Only trigger when APPROVED + passport exists
         if obj.status == IDApplication.STATUS_APPROVED and obj.passport:
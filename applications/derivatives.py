@@ -0,0 +1,140 @@
+from io import BytesIO
+
+from django.core.files.uploadedfile import SimpleUploadedFile
+from PIL import Image, ImageOps
+
+
+# Reviewer thumbnail, same 11:13 aspect as the card slot
+THUMB_SIZE = (110, 130)
+
+DERIVATIVE_FIELDS = ("passport_card", "passport_thumb")
+
+
+# =====================================================
+# PASSPORT DERIVATIVES (BUILT ONCE, AT UPLOAD)
+# EXIF orientation applied, centre-cropped to the card's
+# passport aspect, and stored beside the original so the
+# generator, admin and reviewers never decode the upload.
+# =====================================================
+def card_passport_size():
+    from idcards.layers import PASSPORT_SIZE
+    from idcards.layout import get_layout
+
+    try:
+        return get_layout().passport_size or PASSPORT_SIZE
+    except Exception:
+        return PASSPORT_SIZE
+
+
+def normalize_passport(image, size):
+    """
+    Upright RGB image of exactly `size`, cropped (not squashed)
+    to its aspect ratio.
+    """
+    image = ImageOps.exif_transpose(image)
+
+    if image.mode in ("RGBA", "LA", "P"):
+        rgba = image.convert("RGBA")
+        image = Image.new("RGB", rgba.size, (255, 255, 255))
+        image.paste(rgba, mask=rgba.getchannel("A"))
+    elif image.mode != "RGB":
+        image = image.convert("RGB")
+
+    return ImageOps.fit(image, size, method=Image.LANCZOS)
+
+
+def render_passport_derivatives(data, size, thumb_size=THUMB_SIZE, max_pixels=None):
+    """
+    Return (card_jpeg, thumb_jpeg) for raw upload bytes. Pure
+    Pillow, so it can run inside idcards.sandbox.
+    """
+    with Image.open(BytesIO(data)) as image:
+        if max_pixels and image.width * image.height > max_pixels:
+            raise ValueError(f"Passport too large: {image.width}x{image.height}")
+
+        # JPEG: decode at a reduced scale that still covers the card
+        # slot in either orientation
+        longest = max(size)
+        image.draft("RGB", (longest, longest))
+        card = normalize_passport(image, size)
+
+    thumb = card.resize(thumb_size, Image.LANCZOS)
+
+    return _jpeg(card, 92), _jpeg(thumb, 85)
+
+
+def build_passport_derivatives(source):
+    """
+    Return (card_jpeg, thumb_jpeg) for an uploaded file or raw
+    bytes, sandboxed when IDCARD_RENDER_SANDBOX is on.
+    """
+    from idcards.memory import passport_max_pixels
+    from idcards.sandbox import run_sandboxed, sandbox_enabled
+
+    if isinstance(source, (bytes, bytearray)):
+        data = bytes(source)
+    else:
+        source.seek(0)
+        data = source.read()
+        source.seek(0)
+
+    args = (data, card_passport_size(), THUMB_SIZE, passport_max_pixels())
+
+    if sandbox_enabled():
+        return run_sandboxed(render_passport_derivatives, *args)
+
+    return render_passport_derivatives(*args)
+
+
+def _jpeg(image, quality):
+    with BytesIO() as buffer:
+        image.save(buffer, format="JPEG", quality=quality, optimize=True)
+        return buffer.getvalue()
+
+
+def passport_derivative_files(source, name="passport"):
+    """
+    Field values for IDApplication.passport_card / passport_thumb.
+    Uploaded files when the source decodes, None otherwise, so a
+    replaced passport never keeps a stale derivative.
+    """
+    try:
+        card, thumb = build_passport_derivatives(source)
+    except Exception as e:
+        print("PASSPORT DERIVATIVES FAILED:", str(e))
+        return dict.fromkeys(DERIVATIVE_FIELDS)
+
+    return {
+        "passport_card": SimpleUploadedFile(f"{name}_card.jpg", card, content_type="image/jpeg"),
+        "passport_thumb": SimpleUploadedFile(f"{name}_thumb.jpg", thumb, content_type="image/jpeg"),
+    }
+
+
+def apply_passport_derivatives(application, source):
+    """
+    Set the derivative fields from `source`; the next save uploads
+    them. Returns the stored derivatives replaced.
+    """
+    replaced = [getattr(application, field) for field in DERIVATIVE_FIELDS]
+
+    for field, value in passport_derivative_files(source).items():
+        setattr(application, field, value)
+
+    return [resource for resource in replaced if getattr(resource, "public_id", None)]
+
+
+def discard_derivatives(resources):
+    """
+    Best-effort removal of replaced derivatives.
+    """
+    if not resources:
+        return
+
+    from idcards.storage import get_card_storage
+
+    try:
+        storage = get_card_storage()
+        for resource in resources:
+            storage.delete(resource)
+    except Exception as e:
+        print("PASSPORT DERIVATIVES NOT REMOVED:", str(e))
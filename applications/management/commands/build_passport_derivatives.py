@@ -0,0 +1,50 @@
+from django.core.management.base import BaseCommand
+
+from applications.derivatives import DERIVATIVE_FIELDS, apply_passport_derivatives, discard_derivatives
+from applications.models import IDApplication
+from idcards.passports import get_passport_bytes
+
+
+class Command(BaseCommand):
+    help = "Build card and thumbnail passport derivatives for applications uploaded before they existed"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--all", action="store_true", help="Rebuild derivatives that already exist")
+        parser.add_argument("--limit", type=int, default=0, help="Stop after this many applications")
+
+    def handle(self, *args, **options):
+        applications = IDApplication.objects.exclude(passport__isnull=True).exclude(passport="")
+        if not options["all"]:
+            applications = applications.filter(passport_card__isnull=True) | applications.filter(passport_card="")
+
+        applications = applications.order_by("pk")
+        if options["limit"]:
+            applications = applications[:options["limit"]]
+
+        built = 0
+        failed = 0
+
+        for application in applications.iterator():
+            data = get_passport_bytes(application.passport)
+            if not data:
+                failed += 1
+                self.stderr.write(f"FAILED application {application.pk}: passport download failed")
+                continue
+
+            replaced = apply_passport_derivatives(application, data)
+            if not application.passport_card:
+                failed += 1
+                self.stderr.write(f"FAILED application {application.pk}: passport could not be decoded")
+                continue
+
+            try:
+                application.save(update_fields=list(DERIVATIVE_FIELDS))
+            except Exception as e:
+                failed += 1
+                self.stderr.write(f"FAILED application {application.pk}: {e}")
+                continue
+
+            discard_derivatives(replaced)
+            built += 1
+
+        self.stdout.write(self.style.SUCCESS(f"Done. Built={built}, Failed={failed}"))
@@ -0,0 +1,24 @@
+# Generated by Django 4.2.16 on 2026-10-17 19:22
+
+import cloudinary.models
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('applications', '0005_idapplication_rejection_reason_and_more'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='idapplication',
+            name='passport_card',
+            field=cloudinary.models.CloudinaryField(blank=True, max_length=255, null=True, verbose_name='passport (card)'),
+        ),
+        migrations.AddField(
+            model_name='idapplication',
+            name='passport_thumb',
+            field=cloudinary.models.CloudinaryField(blank=True, max_length=255, null=True, verbose_name='passport (thumbnail)'),
+        ),
+    ]
@@ -0,0 +1,29 @@
+# Generated by Django 4.2.16 on 2026-10-17 19:34
+
+from django.db import migrations
+import idcards.storage
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('applications', '0006_idapplication_passport_card_and_more'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='idapplication',
+            name='passport',
+            field=idcards.storage.CardStorageField(blank=True, max_length=255, null=True, verbose_name='passport'),
+        ),
+        migrations.AlterField(
+            model_name='idapplication',
+            name='passport_card',
+            field=idcards.storage.CardStorageField(blank=True, max_length=255, null=True, verbose_name='passport (card)'),
+        ),
+        migrations.AlterField(
+            model_name='idapplication',
+            name='passport_thumb',
+            field=idcards.storage.CardStorageField(blank=True, max_length=255, null=True, verbose_name='passport (thumbnail)'),
+        ),
+    ]
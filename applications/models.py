@@ -1,7 +1,7 @@
 from django.db import models
 from django.utils import timezone
 from students.models import Student
-from cloudinary.models import CloudinaryField
+from idcards.storage import CardStorageField
 
 
 class IDApplication(models.Model):
@@ -30,9 +30,9 @@ class IDApplication(models.Model):
     )
 
     # =====================================================
-    # PASSPORT (Cloudinary)
+    # PASSPORT (card storage: Cloudinary or local)
     # =====================================================
-    passport = CloudinaryField(
+    passport = CardStorageField(
         "passport",
         resource_type="image",
         folder="id_applications/passports",
@@ -40,6 +40,24 @@ class IDApplication(models.Model):
         null=True,
     )
 
+    # Built from the upload (applications.derivatives): upright,
+    # cropped to the card slot at card resolution, plus a thumbnail
+    passport_card = CardStorageField(
+        "passport (card)",
+        resource_type="image",
+        folder="id_applications/passports/card",
+        blank=True,
+        null=True,
+    )
+
+    passport_thumb = CardStorageField(
+        "passport (thumbnail)",
+        resource_type="image",
+        folder="id_applications/passports/thumb",
+        blank=True,
+        null=True,
+    )
+
     # =====================================================
     # REVIEW STATUS
     # =====================================================
@@ -91,6 +109,16 @@ class IDApplication(models.Model):
     def has_passport(self):
         return bool(self.passport)
 
+    @property
+    def card_passport(self):
+        """Passport as drawn on the card (derivative when available)."""
+        return self.passport_card or self.passport
+
+    @property
+    def review_passport(self):
+        """Smallest stored passport for admin and reviewer screens."""
+        return self.passport_thumb or self.passport
+
     # =====================================================
     # STATE TRANSITION HELPERS
     # =====================================================
@@ -1,4 +1,5 @@
 from rest_framework import serializers
+from .derivatives import passport_derivative_files
 from .models import IDApplication
 
 
@@ -6,3 +7,9 @@ class IDApplicationSerializer(serializers.ModelSerializer):
     class Meta:
         model = IDApplication
         fields = ["passport"]
+
+    def create(self, validated_data):
+        passport = validated_data.get("passport")
+        if passport:
+            validated_data.update(passport_derivative_files(passport))
+        return super().create(validated_data)
@@ -7,6 +7,7 @@ from django.contrib.auth.decorators import login_required
 from django.db import transaction
 from django.contrib import messages
 
+from .derivatives import DERIVATIVE_FIELDS, apply_passport_derivatives, discard_derivatives
 from .models import IDApplication
 from students.models import Student
 from idcards.utils import generate_id_card
@@ -52,18 +53,27 @@ def save_passport(application, passport):
 
     last_error = None
 
+    # Once, before any attempt: a retry must not mistake the previous
+    # attempt's pending uploads for the derivatives being replaced
+    replaced = apply_passport_derivatives(application, passport)
+    derivatives = {field: getattr(application, field) for field in DERIVATIVE_FIELDS}
+
+    # Stored resources have no .delete(); the old original goes with them
+    if getattr(application.passport, "public_id", None):
+        replaced.append(application.passport)
+
     for attempt in range(UPLOAD_RETRIES):
         try:
-            if application.passport:
-                application.passport.delete(save=False)
-
             application.passport = passport
+            for field, value in derivatives.items():
+                setattr(application, field, value)
             application.save()
             application.refresh_from_db()
 
             if not application.passport:
                 raise RuntimeError("Passport not persisted")
 
+            discard_derivatives(replaced)
             return True
 
         except Exception as e:
@@ -187,6 +187,53 @@ FILE_UPLOAD_HANDLERS = [
     "django.core.files.uploadhandler.TemporaryFileUploadHandler",
 ]
 
+# --------------------------------------------------
+# ID card rendering
+# --------------------------------------------------
+# Process pool size for bulk renders (0 = one per available CPU, at
+# most 4; admin actions then render in-process)
+IDCARD_RENDER_WORKERS = int(os.getenv("IDCARD_RENDER_WORKERS", "0")) or None
+
+# Passport downloads kept in flight ahead of the card being composed
+IDCARD_PASSPORT_PREFETCH = int(os.getenv("IDCARD_PASSPORT_PREFETCH", "8"))
+IDCARD_PASSPORT_TIMEOUT = 15
+
+# Fetch passports pre-scaled to card size by Cloudinary; originals
+# (capped at IDCARD_PASSPORT_MAX_BYTES) are only the fallback
+IDCARD_PASSPORT_DERIVATIVES = os.getenv("IDCARD_PASSPORT_DERIVATIVES", "true").lower() == "true"
+IDCARD_PASSPORT_MAX_BYTES = DATA_UPLOAD_MAX_MEMORY_SIZE
+IDCARD_PASSPORT_MAX_PIXELS = int(os.getenv("IDCARD_PASSPORT_MAX_PIXELS", "40000000"))
+
+# Memory-bounded rendering: one decode/compose/encode at a time per
+# process on a reused canvas. MEMORY_TRACE logs each render's peak.
+IDCARD_RENDER_LOW_MEMORY = os.getenv("IDCARD_RENDER_LOW_MEMORY", "false").lower() == "true"
+IDCARD_RENDER_MEMORY_TRACE = os.getenv("IDCARD_RENDER_MEMORY_TRACE", "false").lower() == "true"
+
+# Decode untrusted passports in a forked child with rlimits and a deadline
+IDCARD_RENDER_SANDBOX = os.getenv("IDCARD_RENDER_SANDBOX", "false").lower() == "true"
+IDCARD_SANDBOX_CPU_SECONDS = int(os.getenv("IDCARD_SANDBOX_CPU_SECONDS", "10"))
+IDCARD_SANDBOX_MEMORY_MB = int(os.getenv("IDCARD_SANDBOX_MEMORY_MB", "512"))
+IDCARD_SANDBOX_TIMEOUT = int(os.getenv("IDCARD_SANDBOX_TIMEOUT", "20"))
+
+# Admin card preview: integer downscale of the full card, cache lifetime (s)
+IDCARD_PREVIEW_SCALE = int(os.getenv("IDCARD_PREVIEW_SCALE", "2"))
+IDCARD_PREVIEW_CACHE_SECONDS = int(os.getenv("IDCARD_PREVIEW_CACHE_SECONDS", "60"))
+
+# N-up print sheets: sheets per PDF volume (bounds memory per file)
+IDCARD_PRINT_SHEETS_PER_FILE = int(os.getenv("IDCARD_PRINT_SHEETS_PER_FILE", "100"))
+
+# Card layout spec (YAML, hot reloaded); empty = idcards/layouts/default.yaml
+IDCARD_LAYOUT_SPEC = os.getenv("IDCARD_LAYOUT_SPEC", "")
+
+# Card image encoder: png, png-fast, png-small, webp, webp-lossless, jpeg
+IDCARD_IMAGE_ENCODER = os.getenv("IDCARD_IMAGE_ENCODER", "png")
+
+# Local passport cache (content addressed, LRU; 0 bytes disables it)
+IDCARD_PASSPORT_CACHE_DIR = os.getenv("IDCARD_PASSPORT_CACHE_DIR", "")
+IDCARD_PASSPORT_CACHE_MAX_BYTES = int(
+    os.getenv("IDCARD_PASSPORT_CACHE_MAX_BYTES", str(512 * 1024 * 1024))
+)
+
 # --------------------------------------------------
 # Default primary key
 # --------------------------------------------------
@@ -211,6 +258,27 @@ else:
 
 DEFAULT_FILE_STORAGE = "cloudinary_storage.storage.MediaCloudinaryStorage"
 
+# Card and passport images (idcards.storage): "cloudinary" or "local".
+# Local files live under IDCARD_STORAGE_ROOT and are served from
+# IDCARD_STORAGE_URL (offline development, CI, single-node deployments).
+IDCARD_STORAGE_BACKEND = os.getenv("IDCARD_STORAGE_BACKEND", "cloudinary")
+IDCARD_STORAGE_ROOT = os.getenv("IDCARD_STORAGE_ROOT", str(BASE_DIR / "card_storage"))
+IDCARD_STORAGE_URL = os.getenv("IDCARD_STORAGE_URL", "/idcards/media/")
+
+# Browser cache lifetime for card images and PDFs (s); ETags revalidate after
+IDCARD_IMAGE_MAX_AGE = int(os.getenv("IDCARD_IMAGE_MAX_AGE", "300"))
+
+# Local files are streamed with sendfile. Behind nginx set
+# IDCARD_SENDFILE=x-accel-redirect (internal location
+# IDCARD_SENDFILE_PREFIX aliased to IDCARD_SENDFILE_ROOT);
+# behind Apache/lighttpd use x-sendfile.
+IDCARD_SENDFILE = os.getenv("IDCARD_SENDFILE", "")
+IDCARD_SENDFILE_ROOT = os.getenv("IDCARD_SENDFILE_ROOT", IDCARD_STORAGE_ROOT)
+IDCARD_SENDFILE_PREFIX = os.getenv("IDCARD_SENDFILE_PREFIX", "/protected/")
+
+# Stored failover images are copied here to be streamed from disk
+IDCARD_FAILOVER_SPOOL_DIR = os.getenv("IDCARD_FAILOVER_SPOOL_DIR", os.path.join(IDCARD_STORAGE_ROOT, "failover-spool"))
+
 # --------------------------------------------------
 # Logging (critical for upload debugging)
 # --------------------------------------------------
@@ -225,5 +293,11 @@ LOGGING = {
     "loggers": {
         "django": {"handlers": ["console"], "level": "INFO"},
         "cloudinary": {"handlers": ["console"], "level": "INFO"},
+        # One timing record per card render (passport, qr, compose, encode, upload)
+        "idcards.render": {
+            "handlers": ["console"],
+            "level": os.getenv("IDCARD_RENDER_LOG_LEVEL", "INFO"),
+            "propagate": False,
+        },
     },
 }
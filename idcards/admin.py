@@ -1,9 +1,12 @@
+import tempfile
+
 from django.contrib import admin, messages
+from django.http import FileResponse
 from django.utils.html import format_html
-from django.db import transaction
 
 from .models import IDCard
-from .services import ensure_id_card_exists
+from .generator import render_many, request_render_workers, RENDER_RENDERED, RENDER_EXISTS, RENDER_ERROR
+from .imposition import cards_per_sheet, impose_cards, printable_cards, sheets_per_file
 
 
 @admin.register(IDCard)
@@ -28,9 +31,9 @@ class IDCardAdmin(admin.ModelAdmin):
         "student__last_name",
     )
 
-    list_filter = ("created_at",)
+    list_filter = ("created_at", "student__department", "student__level")
 
-    actions = ["regenerate_id_cards"]
+    actions = ["regenerate_id_cards", "rotate_tokens", "print_sheets_a4", "print_sheets_sra3"]
 
     # =====================================================
     # STATUS COLUMN
@@ -57,14 +60,15 @@ class IDCardAdmin(admin.ModelAdmin):
     # SMALL PREVIEW (LIST VIEW SAFE)
     # =====================================================
     def image_preview_small(self, obj):
-        image_field = getattr(obj, "image", None)
+        # Thumbnail variant: a few KB instead of the full card
+        url = obj.thumbnail_url
 
-        if not image_field or not getattr(image_field, "url", None):
+        if not url:
             return "-"   # SAFE ASCII (avoid encoding crash)
 
         return format_html(
-            '<img src="{}" style="height:60px; border-radius:4px;" />',
-            image_field.url,
+            '<img src="{}" style="height:60px; border-radius:4px;" loading="lazy" />',
+            url,
         )
 
     image_preview_small.short_description = "Preview"
@@ -79,8 +83,9 @@ class IDCardAdmin(admin.ModelAdmin):
             return "No ID card generated"
 
         return format_html(
-            '<img src="{}" style="max-width:420px; border:1px solid #ccc; border-radius:8px;" />',
+            '<img src="{}" srcset="{}" sizes="420px" style="max-width:420px; border:1px solid #ccc; border-radius:8px;" />',
             image_field.url,
+            obj.image_srcset,
         )
 
     image_preview.short_description = "ID Card Preview"
@@ -95,27 +100,89 @@ class IDCardAdmin(admin.ModelAdmin):
         skipped = 0
         failed = 0
 
-        for card in queryset.select_related("student"):
-            try:
-                with transaction.atomic():
+        cards = {card.pk: card for card in queryset.select_related("student")}
+
+        for result in render_many(list(cards), workers=request_render_workers()):
+            if result["status"] in (RENDER_RENDERED, RENDER_EXISTS):
+                regenerated += 1
+            elif result["status"] == RENDER_ERROR:
+                failed += 1
+                self.message_user(
+                    request,
+                    f"Failed for {cards[result['id']].student}: {result['error']}",
+                    level=messages.ERROR,
+                )
+            else:
+                skipped += 1
+
+        self.message_user(
+            request,
+            f"{regenerated} regenerated, {skipped} skipped, {failed} failed.",
+            level=messages.SUCCESS,
+        )
+
+    # =====================================================
+    # TOKEN ROTATION (QR-ONLY RE-RENDER)
+    # Passport and text layers come from cache; only the
+    # QR layer is rebuilt before re-upload.
+    # =====================================================
+    @admin.action(description="Rotate QR tokens and re-issue selected cards")
+    def rotate_tokens(self, request, queryset):
 
-                    result = ensure_id_card_exists(card)
+        cards = {card.pk: card for card in queryset.select_related("student")}
 
-                    if result:
-                        regenerated += 1
-                    else:
-                        skipped += 1
+        for card in cards.values():
+            card.regenerate_token()
 
-            except Exception as e:
+        failed = 0
+        for result in render_many(list(cards), workers=request_render_workers(), force=True):
+            if result["status"] == RENDER_ERROR:
                 failed += 1
                 self.message_user(
                     request,
-                    f"Failed for {card.student}: {str(e)}",
+                    f"Re-issue failed for {cards[result['id']].student}: {result['error']}",
                     level=messages.ERROR,
                 )
 
         self.message_user(
             request,
-            f"{regenerated} regenerated, {skipped} skipped, {failed} failed.",
+            f"{len(cards)} tokens rotated, {len(cards) - failed} re-issued, {failed} failed.",
             level=messages.SUCCESS,
         )
+
+    # =====================================================
+    # PRINT SHEETS (N-UP PDF WITH CROP MARKS)
+    # Written to a temporary file, not held in the response.
+    # Batches beyond one volume go through `print_sheets`.
+    # =====================================================
+    def _print_sheets(self, request, queryset, sheet):
+        cards = printable_cards(queryset)
+        total = cards.count()
+        limit = cards_per_sheet(sheet) * sheets_per_file()
+
+        if not total:
+            self.message_user(request, "No approved, active cards selected.", level=messages.WARNING)
+            return None
+
+        if total > limit:
+            self.message_user(
+                request,
+                f"{total} cards selected; the admin prints at most {limit}. "
+                f"Use: manage.py print_sheets --sheet {sheet} ...",
+                level=messages.ERROR,
+            )
+            return None
+
+        output = tempfile.TemporaryFile()
+        impose_cards(cards.iterator(chunk_size=500), output, sheet)
+        output.seek(0)
+
+        return FileResponse(output, as_attachment=True, filename=f"id-cards-{sheet.lower()}.pdf")
+
+    @admin.action(description="Print selected cards (A4 sheets, PDF)")
+    def print_sheets_a4(self, request, queryset):
+        return self._print_sheets(request, queryset, "A4")
+
+    @admin.action(description="Print selected cards (SRA3 sheets, PDF)")
+    def print_sheets_sra3(self, request, queryset):
+        return self._print_sheets(request, queryset, "SRA3")
@@ -0,0 +1,85 @@
+import tracemalloc
+from io import BytesIO
+
+from django.core.files.base import ContentFile
+from django.core.files.storage import FileSystemStorage
+
+from idcards.encoders import get_encoder
+from idcards.generator import compose_card
+from idcards.layers import PASSPORT_SIZE, decode_passport
+from idcards.layout import get_layout
+from idcards.memory import max_rss_bytes
+from idcards.synthetic import synthetic_details, synthetic_passport, synthetic_verify_url
+from idcards.timing import RenderTimer
+from idcards.variants import UPLOAD_FIELDS, card_variant_values
+
+
+# =====================================================
+# RENDER BENCHMARK (manage.py bench_render)
+# The real passport / qr / compose / encode / variants
+# code paths on synthetic inputs. Passports are decoded
+# cold from JPEG bytes on every card; "upload" writes the
+# card and its variants to a local FileSystemStorage
+# instead of Cloudinary.
+# =====================================================
+_passport_jpegs = {}
+
+
+def passport_jpeg(seed):
+    data = _passport_jpegs.get(seed)
+
+    if data is None:
+        buffer = BytesIO()
+        synthetic_passport(seed).save(buffer, format="JPEG", quality=90)
+        data = _passport_jpegs[seed] = buffer.getvalue()
+
+    return data
+
+
+def bench_card(index, storage, encoder, passports=16, trace_memory=False):
+    data = passport_jpeg(index % max(1, passports))
+    timer = RenderTimer(index)
+
+    if trace_memory:
+        tracemalloc.start()
+
+    try:
+        with timer.stage("passport"):
+            passport = decode_passport(data, get_layout().passport_size or PASSPORT_SIZE)
+
+        with timer.stage("compose"):
+            card = compose_card(passport, synthetic_details(index), synthetic_verify_url(index), timer=timer)
+
+        with timer.stage("encode"):
+            image_bytes = encoder.encode(card)
+
+        with timer.stage("variants"):
+            variants = card_variant_values(card, index)
+        card.close()
+
+        with timer.stage("upload"):
+            storage.save(f"{index}.{encoder.extension}", ContentFile(image_bytes))
+            for field in UPLOAD_FIELDS:
+                storage.save(variants[field].name, variants[field])
+
+        timer.status = "uploaded"
+        record = timer.record()
+        record["bytes"] = len(image_bytes)
+        record["python_peak"] = tracemalloc.get_traced_memory()[1] if trace_memory else None
+        return record
+
+    finally:
+        if trace_memory:
+            tracemalloc.stop()
+
+
+def bench_chunk(indices, storage_dir, encoder_name=None, passports=16, trace_memory=False):
+    storage = FileSystemStorage(location=storage_dir)
+    encoder = get_encoder(encoder_name)
+
+    records = [bench_card(i, storage, encoder, passports, trace_memory) for i in indices]
+
+    return {
+        "records": records,
+        "rss_peak": max_rss_bytes(),
+    }
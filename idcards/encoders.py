@@ -0,0 +1,71 @@
+from io import BytesIO
+
+from django.conf import settings
+
+
+# =====================================================
+# CARD IMAGE ENCODERS
+# Pick one per deployment with IDCARD_IMAGE_ENCODER;
+# compare them with `manage.py bench_encoders`.
+# =====================================================
+class CardEncoder:
+
+    def __init__(self, name, image_format, extension, content_type, **options):
+        self.name = name
+        self.image_format = image_format
+        self.extension = extension
+        self.content_type = content_type
+        self.options = options
+
+    def encode(self, image):
+        with BytesIO() as buffer:
+            image.save(buffer, format=self.image_format, **self.options)
+            return buffer.getvalue()
+
+    def __repr__(self):
+        return f"<CardEncoder {self.name}>"
+
+
+ENCODERS = {
+    encoder.name: encoder
+    for encoder in (
+        # Pillow's default PNG settings (previous behaviour)
+        CardEncoder("png", "PNG", "png", "image/png", compress_level=6),
+        CardEncoder("png-fast", "PNG", "png", "image/png", compress_level=1),
+        CardEncoder("png-small", "PNG", "png", "image/png", compress_level=9, optimize=True),
+        CardEncoder("webp", "WEBP", "webp", "image/webp", quality=90, method=4),
+        CardEncoder("webp-lossless", "WEBP", "webp", "image/webp", lossless=True, quality=80, method=4),
+        CardEncoder("jpeg", "JPEG", "jpg", "image/jpeg", quality=92, subsampling=0, optimize=True),
+    )
+}
+
+DEFAULT_ENCODER = "png"
+
+
+def get_encoder(name=None):
+    name = name or getattr(settings, "IDCARD_IMAGE_ENCODER", DEFAULT_ENCODER)
+
+    try:
+        return ENCODERS[name]
+    except KeyError:
+        print("ENCODER: UNKNOWN", name, "- USING", DEFAULT_ENCODER)
+        return ENCODERS[DEFAULT_ENCODER]
+
+
+# =====================================================
+# CONTENT SNIFFING (FAILOVER BYTES CARRY NO METADATA)
+# =====================================================
+def sniff_image_type(data):
+    """
+    Return (content_type, extension) for encoded card bytes.
+    """
+    head = bytes(data[:12])
+
+    if head.startswith(b"\x89PNG"):
+        return "image/png", "png"
+    if head.startswith(b"\xff\xd8"):
+        return "image/jpeg", "jpg"
+    if head[:4] == b"RIFF" and head[8:12] == b"WEBP":
+        return "image/webp", "webp"
+
+    return "application/octet-stream", "bin"
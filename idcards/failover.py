@@ -0,0 +1,231 @@
+import glob
+import os
+import tempfile
+
+from django.conf import settings
+
+from idcards.encoders import sniff_image_type
+from idcards.models import FailoverImage
+
+
+# =====================================================
+# DURABLE FAILOVER IMAGES
+# When the storage upload fails, the rendered bytes are
+# kept in the database under (card, render fingerprint).
+# Views serve them without re-rendering until the flush
+# job uploads them; a changed fingerprint (new passport,
+# details, token or layout) makes them stale.
+# =====================================================
+def store_failover_image(idcard, image_bytes, content_type, tracking):
+    """
+    Persist a failover render, replacing older ones for the card.
+    Never raises: the caller still has the bytes to serve.
+    """
+    fingerprint = tracking["render_fingerprint"]
+
+    try:
+        FailoverImage.objects.update_or_create(
+            card=idcard,
+            fingerprint=fingerprint,
+            defaults={
+                "render_inputs": tracking.get("render_inputs"),
+                "content_type": content_type,
+                "data": image_bytes,
+                "checksum": tracking["image_checksum"],
+                "rendered_at": tracking["rendered_at"],
+            },
+        )
+        FailoverImage.objects.filter(card=idcard).exclude(fingerprint=fingerprint).delete()
+        print("FAILOVER: IMAGE STORED", idcard.uid)
+
+    except Exception as e:
+        print("FAILOVER: STORE FAILED:", str(e))
+
+
+def load_failover_image(idcard, fingerprint):
+    """
+    Stored bytes for this exact render, or None.
+    """
+    try:
+        data = (
+            FailoverImage.objects
+            .filter(card=idcard, fingerprint=fingerprint)
+            .values_list("data", flat=True)
+            .first()
+        )
+    except Exception as e:
+        print("FAILOVER: LOAD FAILED:", str(e))
+        return None
+
+    if data is None:
+        return None
+
+    print("FAILOVER: SERVED FROM STORE", idcard.uid)
+    return bytes(data)
+
+
+def failover_rendered_at(idcard, fingerprint):
+    """
+    When the stored image for this exact render was drawn, or None.
+    """
+    try:
+        return (
+            FailoverImage.objects
+            .filter(card=idcard, fingerprint=fingerprint)
+            .values_list("rendered_at", flat=True)
+            .first()
+        )
+    except Exception as e:
+        print("FAILOVER: LOOKUP FAILED:", str(e))
+        return None
+
+
+# =====================================================
+# DISK SPOOL (ZERO-COPY SERVING)
+# A stored image is copied once to <spool>/<uid>-<fingerprint>.<ext>
+# so views stream it with sendfile (idcards.sendfile) rather
+# than loading the blob into memory on every request.
+# =====================================================
+def spool_dir():
+    return getattr(settings, "IDCARD_FAILOVER_SPOOL_DIR", "") or os.path.join(
+        getattr(settings, "IDCARD_STORAGE_ROOT", "") or os.path.join(settings.BASE_DIR, "card_storage"),
+        "failover-spool",
+    )
+
+
+def discard_spool(idcard, keep=None):
+    for path in glob.glob(os.path.join(spool_dir(), f"{idcard.uid}-*")):
+        if path != keep:
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+
+
+def spooled_failover_file(idcard, fingerprint):
+    """
+    Path of the spooled image for this exact render, written from
+    the database on first use, or None when nothing is stored.
+    """
+    base = os.path.join(spool_dir(), f"{idcard.uid}-{fingerprint}")
+
+    existing = glob.glob(base + ".*")
+    if existing:
+        return existing[0]
+
+    data = load_failover_image(idcard, fingerprint)
+    if data is None:
+        return None
+
+    _, extension = sniff_image_type(data)
+    path = f"{base}.{extension}"
+
+    temp = None
+    try:
+        os.makedirs(spool_dir(), exist_ok=True)
+        # Unique per writer (threads share a pid); the dot prefix
+        # keeps it out of the globs above
+        fd, temp = tempfile.mkstemp(dir=spool_dir(), prefix=".", suffix=".tmp")
+        with os.fdopen(fd, "wb") as f:
+            f.write(data)
+        os.replace(temp, path)
+    except OSError as e:
+        print("FAILOVER: SPOOL FAILED:", str(e))
+        if temp and os.path.exists(temp):
+            os.remove(temp)
+        return None
+
+    discard_spool(idcard, keep=path)
+    return path
+
+
+def current_fingerprint(idcard):
+    """
+    Fingerprint of what the card would be rendered from now, or
+    None when it cannot be rendered. Never raises.
+    """
+    from idcards.fingerprint import compute_fingerprint
+    from idcards.generator import current_render_inputs
+
+    try:
+        inputs = current_render_inputs(idcard)
+        return compute_fingerprint(inputs) if inputs is not None else None
+    except Exception as e:
+        print("FAILOVER: FINGERPRINT FAILED:", str(e))
+        return None
+
+
+def current_failover_file(idcard, fingerprint=None):
+    """
+    Spooled failover image matching what the card would be
+    rendered from now, or None. Never raises.
+    """
+    fingerprint = fingerprint or current_fingerprint(idcard)
+    if not fingerprint:
+        return None
+
+    try:
+        return spooled_failover_file(idcard, fingerprint)
+    except Exception as e:
+        print("FAILOVER: SPOOL LOOKUP FAILED:", str(e))
+        return None
+
+
+# =====================================================
+# FLUSH (UPLOAD PENDING IMAGES)
+# =====================================================
+FLUSH_UPLOADED = "uploaded"
+FLUSH_STALE = "stale"
+FLUSH_FAILED = "failed"
+
+
+def flush_failover_image(record):
+    """
+    Upload one stored image to the card's storage backend.
+    Returns FLUSH_UPLOADED, FLUSH_STALE (dropped) or FLUSH_FAILED.
+    """
+    from idcards.fingerprint import compute_fingerprint
+    from idcards.generator import _discard_previous_images, _stored_images, _try_save_image, current_render_inputs
+    from idcards.variants import card_variant_values
+
+    card = record.card
+
+    # Already uploaded by a later render
+    if card.has_image and card.render_fingerprint == record.fingerprint:
+        record.delete()
+        discard_spool(card)
+        return FLUSH_UPLOADED
+
+    inputs = current_render_inputs(card)
+    if inputs is None or compute_fingerprint(inputs) != record.fingerprint:
+        record.delete()
+        discard_spool(card)
+        return FLUSH_STALE
+
+    data = bytes(record.data)
+    _, extension = sniff_image_type(data)
+    matric = getattr(card.student, "matric_number", "") or card.uid
+    previous = _stored_images(card)
+    variants = card_variant_values(data, matric)
+
+    tracking = {
+        "render_fingerprint": record.fingerprint,
+        "render_inputs": record.render_inputs,
+        "image_checksum": record.checksum,
+        "rendered_at": record.rendered_at,
+    }
+
+    if _try_save_image(card, data, f"{matric}.{extension}", record.content_type, tracking, variants):
+        _discard_previous_images(previous, card)
+        record.delete()
+        discard_spool(card)
+        return FLUSH_UPLOADED
+
+    record.attempts += 1
+    record.last_error = "upload failed"
+    record.save(update_fields=["attempts", "last_error"])
+    return FLUSH_FAILED
+
+
+def pending_failover_images():
+    return FailoverImage.objects.select_related("card", "card__student").order_by("attempts", "rendered_at")
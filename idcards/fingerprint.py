@@ -0,0 +1,70 @@
+import hashlib
+import json
+import os
+import threading
+
+
+# =====================================================
+# RENDER INPUT FINGERPRINTS
+# Everything that ends up in a card image is hashed, so
+# a stale card can be found without re-rendering it.
+# =====================================================
+_checksums = {}
+_checksums_lock = threading.Lock()
+
+
+def file_checksum(path):
+    """
+    SHA-256 of a file, cached until its mtime or size changes.
+    Missing files hash to an empty string.
+    """
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return ""
+
+    stamp = (stat.st_mtime_ns, stat.st_size)
+    cached = _checksums.get(path)
+    if cached and cached[0] == stamp:
+        return cached[1]
+
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1024 * 1024), b""):
+            digest.update(block)
+
+    with _checksums_lock:
+        _checksums[path] = (stamp, digest.hexdigest())
+
+    return digest.hexdigest()
+
+
+def passport_version(resource):
+    """
+    Identify a passport upload by public_id + version.
+    """
+    if not resource:
+        return ""
+
+    public_id = getattr(resource, "public_id", None)
+    if public_id:
+        return f"{public_id}@{getattr(resource, 'version', None) or ''}"
+
+    return str(resource)
+
+
+def compute_fingerprint(inputs):
+    payload = json.dumps(inputs, sort_keys=True, separators=(",", ":"), default=str)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+def bytes_checksum(data):
+    return hashlib.sha256(data).hexdigest()
+
+
+def changed_inputs(old, new):
+    """
+    Top-level keys whose values differ between two input dicts.
+    """
+    old = old or {}
+    return sorted(key for key in set(old) | set(new) if old.get(key) != new.get(key))
@@ -1,44 +1,36 @@
-import requests
-from PIL import Image, ImageDraw, ImageFont, ImageEnhance
+from PIL import Image, ImageDraw, ImageEnhance
 from django.conf import settings
-from django.core.files.base import ContentFile
-from io import BytesIO
+from django.core.cache import cache
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.db import transaction
+from django.db.models import Q
+from django.utils import timezone
+import multiprocessing
 import os
-import qrcode
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from io import BytesIO
 
 from applications.models import IDApplication
+from idcards.encoders import get_encoder
+from idcards.failover import load_failover_image, store_failover_image
+from idcards.fingerprint import bytes_checksum, compute_fingerprint, file_checksum, passport_version
+from idcards.layers import PASSPORT_SIZE, passport_layer, paste_text
+from idcards.layout import get_layout
+from idcards.memory import bounded_render, low_memory_enabled, render_memory, reusable_canvas
+from idcards.passports import PassportPrefetcher
+from idcards.qr import prime_qr_matrices, render_qr
+from idcards.storage import get_card_storage
+from idcards.textfit import fit_text, get_font
+from idcards.timing import NULL_TIMER, RenderTimer
+from idcards.variants import UPLOAD_FIELDS, card_variant_values
 
 
-# =====================================================
-# SAFE FONT LOADER
-# =====================================================
-def load_fonts():
-    font_path = os.path.join(settings.BASE_DIR, "static/fonts/DejaVuSans-Bold.ttf")
+# Bump whenever compose_card or the template drawing code changes
+# (layout spec edits are tracked through its checksum instead)
+LAYOUT_VERSION = 2
 
-    try:
-        return (
-            ImageFont.truetype(font_path, 48),
-            ImageFont.truetype(font_path, 32),
-            ImageFont.truetype(font_path, 26),
-        )
-    except Exception:
-        default = ImageFont.load_default()
-        return default, default, default
-
-
-# =====================================================
-# QR IMAGE BUILDER
-# =====================================================
-def create_qr_code(data):
-    qr = qrcode.QRCode(
-        version=None,
-        box_size=6,
-        border=2,
-        error_correction=qrcode.constants.ERROR_CORRECT_H,
-    )
-    qr.add_data(data)
-    qr.make(fit=True)
-    return qr.make_image(fill_color="black", back_color="white").convert("RGB")
+LOGO_PATH = os.path.join(settings.BASE_DIR, "static/images/university_logo.png")
 
 
 # =====================================================
@@ -76,19 +68,17 @@ def build_verify_url(idcard):
 # =====================================================
 # WATERMARK
 # =====================================================
-def apply_logo_watermark(card):
-    logo_path = os.path.join(settings.BASE_DIR, "static/images/university_logo.png")
-
+def apply_logo_watermark(card, logo_path=LOGO_PATH, scale=0.35, opacity=0.06):
     if not os.path.exists(logo_path):
         return card
 
     try:
         logo = Image.open(logo_path).convert("RGBA")
         w, h = card.size
-        logo = logo.resize((int(w * 0.35), int(h * 0.35)))
+        logo = logo.resize((int(w * scale), int(h * scale)))
 
         alpha = logo.split()[3]
-        alpha = ImageEnhance.Brightness(alpha).enhance(0.06)  # lighter watermark
+        alpha = ImageEnhance.Brightness(alpha).enhance(opacity)  # lighter watermark
         logo.putalpha(alpha)
 
         card.paste(logo, ((w - logo.width) // 2, (h - logo.height) // 2), logo)
@@ -98,6 +88,73 @@ def apply_logo_watermark(card):
     return card
 
 
+# =====================================================
+# CARD TEMPLATE CACHE (ONE PER WORKER PROCESS)
+# The static part of the layout (bars, title, labels,
+# watermark) is drawn once and copied for every card.
+# Rebuilt whenever the compiled layout is reloaded.
+# =====================================================
+_template = None
+_template_lock = threading.Lock()
+
+
+class CardTemplate:
+    """
+    Pre-rendered base card for one compiled layout.
+    """
+
+    def __init__(self, layout, base):
+        self.layout = layout
+        self.base = base
+
+    def new_card(self):
+        return self.base.copy()
+
+
+def _build_card_template(layout):
+    base = Image.new("RGB", layout.size, layout.background)
+    draw = ImageDraw.Draw(base)
+
+    for op in layout.static_ops:
+        kind = op[0]
+
+        if kind == "rect":
+            draw.rectangle(op[1], fill=op[2])
+        elif kind == "text":
+            draw.text(op[1], op[2], font=op[3], fill=op[4])
+        elif kind == "watermark":
+            base = apply_logo_watermark(base, op[1], op[2], op[3])
+            draw = ImageDraw.Draw(base)
+
+    print("GENERATOR: TEMPLATE BUILT")
+    return CardTemplate(layout, base)
+
+
+def get_card_template():
+    """
+    Return the cached template, rebuilding it only when the
+    layout spec, fonts or logo on disk have changed.
+    """
+    global _template
+
+    layout = get_layout()
+    template = _template
+
+    if template is not None and template.layout is layout:
+        return template
+
+    with _template_lock:
+        if _template is None or _template.layout is not layout:
+            _template = _build_card_template(layout)
+        return _template
+
+
+def clear_card_template():
+    global _template
+    with _template_lock:
+        _template = None
+
+
 # =====================================================
 # STUDENT DATA
 # =====================================================
@@ -119,35 +176,147 @@ def get_student_details(student):
 # =====================================================
 # LOAD PASSPORT FROM CLOUDINARY
 # =====================================================
-def load_passport(student):
-    app = IDApplication.objects.filter(
+def get_approved_application(student):
+    return IDApplication.objects.filter(
         student=student,
         status=IDApplication.STATUS_APPROVED
     ).first()
 
+
+def load_passport(student, fetcher=None, application=None):
+    """
+    `fetcher` is an optional PassportPrefetcher supplied by batch renders.
+    """
+    app = application or get_approved_application(student)
+
     if not app or not app.passport:
         print("GENERATOR: NO PASSPORT")
         return None
 
     try:
-        response = requests.get(app.passport.url, timeout=15)
+        size = get_layout().passport_size or PASSPORT_SIZE
+        photo = passport_layer(app.card_passport, fetcher=fetcher, size=size)
 
-        if response.status_code != 200:
+        if photo is None:
             print("GENERATOR: PASSPORT DOWNLOAD FAILED")
-            return None
 
-        photo = Image.open(BytesIO(response.content)).convert("RGB")
-        return photo.resize((220, 260))
+        return photo
 
     except Exception as e:
         print("GENERATOR: PASSPORT LOAD FAILED:", str(e))
         return None
 
 
+# =====================================================
+# CARD COMPOSITION (STUDENT-SPECIFIC LAYERS ONLY)
+# Walks the compiled layout's field ops; every layer
+# comes from its own cache (see idcards.layers).
+# =====================================================
+def compose_card(passport, details, verify_url, reuse_canvas=False, timer=NULL_TIMER):
+    """
+    With `reuse_canvas` the card is drawn on this thread's shared
+    canvas (see idcards.memory); it is only valid until the next
+    compose on the same thread. `timer` is an optional
+    idcards.timing.RenderTimer.
+    """
+    template = get_card_template()
+    card = reusable_canvas(template.base) if reuse_canvas else template.new_card()
+
+    for op in template.layout.field_ops:
+        kind = op[0]
+
+        if kind == "passport":
+            if passport.size != op[2]:
+                passport = passport.resize(op[2])
+            card.paste(passport, op[1])
+
+        elif kind == "text":
+            _draw_text_field(card, op, details[op[2]])
+
+        # =====================================================
+        # GUARANTEED QR
+        # =====================================================
+        elif kind == "qr" and verify_url:
+            try:
+                with timer.stage("qr"):
+                    qr = render_qr(verify_url, op[2])
+                card.paste(qr, op[1])
+                print("QR OK:", verify_url)
+            except Exception as e:
+                print("QR CRITICAL FAILURE:", str(e))
+
+    return card
+
+
+def _draw_text_field(card, op, value):
+    _, (x, y), _, font, fill, fit = op
+
+    if not fit:
+        paste_text(card, (x, y), value, font, fill)
+        return
+
+    size, lines = fit_text(value, *fit)
+    line_font = font if size == font.size else get_font(fit[0], size)
+
+    for dy, line in lines:
+        paste_text(card, (x, y + dy), line, line_font, fill)
+
+
+# =====================================================
+# RENDER INPUTS (FINGERPRINT SOURCE)
+# =====================================================
+def get_render_inputs(details, passport, verify_url):
+    """
+    Every input that reaches the card image. `passport` is the
+    approved application's card_passport (derivative or original).
+    """
+    return {
+        "student": list(details),
+        "passport": passport_version(passport),
+        "verify_url": verify_url or "",
+        "layout": LAYOUT_VERSION,
+        "assets": {
+            os.path.basename(path): file_checksum(path) for path in get_layout().asset_paths
+        },
+        "encoder": get_encoder().name,
+    }
+
+
+def current_render_inputs(idcard, application=None):
+    """
+    Inputs the card would be rendered from right now, or None
+    when it cannot be rendered (no approved passport).
+    """
+    application = application or get_approved_application(idcard.student)
+
+    if not application or not application.passport:
+        return None
+
+    return get_render_inputs(
+        get_student_details(idcard.student),
+        application.card_passport,
+        build_verify_url(idcard),
+    )
+
+
 # =====================================================
 # MAIN GENERATOR
 # =====================================================
-def generate_id_card(idcard, request=None):
+def generate_id_card(idcard, request=None, fetcher=None, force=False):
+    """
+    `force` re-renders a card that already has an image; the
+    upload is skipped when the new bytes match the stored ones.
+    """
+    timer = RenderTimer(getattr(idcard, "uid", ""))
+
+    try:
+        with render_memory(timer.label):
+            return _generate_id_card(idcard, fetcher=fetcher, force=force, timer=timer)
+    finally:
+        timer.finish()
+
+
+def _generate_id_card(idcard, fetcher=None, force=False, timer=NULL_TIMER):
 
     print("GENERATOR: START")
 
@@ -155,91 +324,441 @@ def generate_id_card(idcard, request=None):
         return None
 
     # Already saved in Cloudinary
-    if idcard.image and getattr(idcard.image, "public_id", None):
+    if not force and idcard.has_image:
         return idcard.image.url
 
     student = getattr(idcard, "student", None)
     if not student:
         return None
 
-    passport = load_passport(student)
-    if not passport:
-        return None
-
-    width, height = 1010, 640
-    card = Image.new("RGB", (width, height), "white")
-    draw = ImageDraw.Draw(card)
-
-    font_big, font_mid, font_small = load_fonts()
+    application = get_approved_application(student)
 
-    # Header
-    draw.rectangle((0, 0, width, 120), fill=(0, 102, 0))
-    draw.text((30, 30), "EKSU STUDENT ID CARD", font=font_big, fill="white")
+    # Rendered during a storage outage and not uploaded yet
+    if not force:
+        stored = _stored_failover_image(idcard, application)
+        if stored is not None:
+            timer.status = "failover-stored"
+            return stored
 
-    # Passport
-    card.paste(passport, (50, 180))
-
-    full_name, matric, dept, level, phone = get_student_details(student)
+    with timer.stage("passport"):
+        passport = load_passport(student, fetcher=fetcher, application=application)
+    if not passport:
+        return None
 
-    draw.text((320, 200), f"Name: {full_name}", font=font_mid, fill="black")
-    draw.text((320, 260), f"Matric No: {matric}", font=font_mid, fill="black")
-    draw.text((320, 320), f"Department: {dept}", font=font_mid, fill="black")
-    draw.text((320, 380), f"Level: {level}", font=font_mid, fill="black")
-    draw.text((320, 440), f"Phone: {phone}", font=font_mid, fill="black")
+    details = get_student_details(student)
+    matric = details[1]
 
-    # =====================================================
-    # GUARANTEED QR
-    # =====================================================
     try:
         verify_url = build_verify_url(idcard)
-        qr_img = create_qr_code(verify_url).resize((180, 180))
-        card.paste(qr_img, (800, 360))
-        print("QR OK:", verify_url)
     except Exception as e:
         print("QR CRITICAL FAILURE:", str(e))
+        verify_url = None
+
+    inputs = get_render_inputs(details, application.card_passport, verify_url)
+    low_memory = low_memory_enabled()
 
-    # Footer
-    draw.rectangle((0, height - 80, width, height), fill=(0, 102, 0))
-    draw.text((40, height - 60), "Property of EKSU", font=font_small, fill="white")
+    with bounded_render():
+        with timer.stage("compose"):
+            card = compose_card(passport, details, verify_url, reuse_canvas=low_memory, timer=timer)
 
-    # Apply watermark AFTER QR
-    card = apply_logo_watermark(card)
+        try:
+            encoder = get_encoder()
+            with timer.stage("encode"):
+                image_bytes = encoder.encode(card)
+
+            checksum = bytes_checksum(image_bytes)
+            unchanged = idcard.has_image and checksum == idcard.image_checksum
+
+            # Variants only when they will be stored; cards rendered
+            # before variants existed get them on an unchanged render
+            variants = None
+            if not unchanged or not idcard.image_placeholder:
+                variants = _card_variants(card, matric or idcard.uid, timer)
+        except Exception as e:
+            print("GENERATOR FAILURE:", str(e))
+            return None
+        finally:
+            if not low_memory:
+                card.close()
 
     # Save / Failover
     try:
-        buffer = BytesIO()
-        card.save(buffer, format="PNG")
-        png_bytes = buffer.getvalue()
+        tracking = {
+            "render_fingerprint": compute_fingerprint(inputs),
+            "render_inputs": inputs,
+            "image_checksum": checksum,
+            "rendered_at": timezone.now(),
+        }
+
+        if unchanged:
+            print("GENERATOR: IMAGE UNCHANGED - UPLOAD SKIPPED")
+            _try_save_fields(idcard, {**tracking, **(variants or {})})
+            timer.status = "unchanged"
+            return idcard.image.url
+
+        filename = f"{matric or idcard.uid}.{encoder.extension}"
+        previous = _stored_images(idcard)
 
-        filename = f"{matric or idcard.uid}.png"
+        with timer.stage("upload"):
+            saved = _try_save_image(idcard, image_bytes, filename, encoder.content_type, tracking, variants)
+            if saved:
+                _discard_previous_images(previous, idcard)
 
-        if _try_save_cloudinary(idcard, png_bytes, filename):
+        if saved:
+            timer.status = "uploaded"
             return idcard.image.url
 
         print("FAILOVER: USING MEMORY IMAGE")
-        return png_bytes
+        store_failover_image(idcard, image_bytes, encoder.content_type, tracking)
+        timer.status = "failover"
+        return image_bytes
 
     except Exception as e:
         print("GENERATOR FAILURE:", str(e))
         return None
 
 
+def _card_variants(card, name, timer=NULL_TIMER):
+    with timer.stage("variants"):
+        return card_variant_values(card, name)
+
+
+def _stored_failover_image(idcard, application):
+    try:
+        inputs = current_render_inputs(idcard, application)
+        if inputs is None:
+            return None
+        return load_failover_image(idcard, compute_fingerprint(inputs))
+    except Exception as e:
+        print("FAILOVER: LOOKUP FAILED:", str(e))
+        return None
+
+
 # =====================================================
-# CLOUDINARY SAVE
+# IMAGE SAVE (CONFIGURED STORAGE BACKEND)
 # =====================================================
-def _try_save_cloudinary(idcard, png_bytes, filename):
-    try:
-        field = getattr(idcard, "image", None)
+def _try_save_image(idcard, image_bytes, filename, content_type, tracking=None, variants=None):
+    values = {
+        # CardStorageField uploads UploadedFile values in pre_save
+        "image": SimpleUploadedFile(filename, image_bytes, content_type=content_type),
+        **(variants or {}),
+        **(tracking or {}),
+    }
+
+    return _try_save_fields(idcard, values) and bool(idcard.image)
 
-        if not field or not hasattr(field, "save"):
-            print("CLOUDINARY: FIELD INVALID")
-            return False
 
-        field.save(filename, ContentFile(png_bytes), save=True)
+def _try_save_fields(idcard, values):
+    previous = {field: getattr(idcard, field) for field in values}
+
+    try:
+        for field, value in values.items():
+            setattr(idcard, field, value)
+
+        # Own savepoint: a failed upload must not poison a caller's
+        # atomic block (the failover image is stored right after)
+        with transaction.atomic():
+            idcard.save(update_fields=list(values))
         idcard.refresh_from_db()
 
-        return bool(idcard.image)
+        return True
 
     except Exception as e:
-        print("CLOUDINARY SAVE FAILED:", str(e))
+        print("IMAGE SAVE FAILED:", str(e))
+        for field, value in previous.items():
+            setattr(idcard, field, value)
         return False
+
+
+def _stored_images(idcard):
+    return {field: getattr(idcard, field) for field in ("image", *UPLOAD_FIELDS)}
+
+
+def _discard_previous_images(previous, idcard):
+    for field, resource in previous.items():
+        _discard_previous_image(resource, getattr(idcard, field))
+
+
+def _discard_previous_image(previous, current):
+    """
+    Best-effort removal of the asset replaced by a forced re-render.
+    """
+    old_id = getattr(previous, "public_id", None)
+
+    if not old_id or old_id == getattr(current, "public_id", None):
+        return
+
+    try:
+        get_card_storage().delete(previous)
+    except Exception as e:
+        print("STORAGE: OLD IMAGE NOT REMOVED:", str(e))
+
+
+# =====================================================
+# CARD PREVIEW (ADMIN: NO UPLOAD, NO DB WRITES)
+# Same layout and layer caches as a real render, shrunk
+# and cached briefly per application and inputs.
+# =====================================================
+PREVIEW_SCALE = 2
+PREVIEW_CACHE_SECONDS = 60
+
+
+def _preview_verify_url(student):
+    """
+    The card's real verify URL when it already has a token.
+    Never creates a token (that would be a DB write).
+    """
+    from idcards.models import IDCard
+
+    idcard = IDCard.objects.filter(student=student).first()
+    if idcard and idcard.verify_token:
+        return build_verify_url(idcard)
+
+    base = getattr(settings, "SITE_URL", "").strip().rstrip("/")
+    return f"{base}/verify/preview/"
+
+
+def render_card_preview(application):
+    """
+    JPEG bytes of a reduced-resolution card for `application`,
+    or None when it has no usable passport. Never raises.
+    """
+    try:
+        passport_resource = application.card_passport
+        if not passport_resource:
+            return None
+
+        details = get_student_details(application.student)
+        layout = get_layout()
+
+        key = "idcards:preview:%s:%s" % (
+            application.pk,
+            compute_fingerprint({
+                "details": details,
+                "passport": passport_version(passport_resource),
+                "layout": layout.checksum,
+                "version": LAYOUT_VERSION,
+            }),
+        )
+
+        data = cache.get(key)
+        if data is not None:
+            return data
+
+        passport = passport_layer(passport_resource, size=layout.passport_size or PASSPORT_SIZE)
+        if passport is None:
+            return None
+
+        card = compose_card(passport, details, _preview_verify_url(application.student))
+        scale = int(getattr(settings, "IDCARD_PREVIEW_SCALE", PREVIEW_SCALE))
+
+        with card, card.reduce(scale) as small, BytesIO() as buffer:
+            small.save(buffer, format="JPEG", quality=80)
+            data = buffer.getvalue()
+
+        cache.set(key, data, int(getattr(settings, "IDCARD_PREVIEW_CACHE_SECONDS", PREVIEW_CACHE_SECONDS)))
+        return data
+
+    except Exception as e:
+        print("GENERATOR: PREVIEW FAILED:", str(e))
+        return None
+
+
+# =====================================================
+# BATCH RENDERING (PROCESS POOL)
+# =====================================================
+RENDER_RENDERED = "rendered"
+RENDER_EXISTS = "exists"
+RENDER_FAILOVER = "failover"
+RENDER_SKIPPED = "skipped"
+RENDER_ERROR = "error"
+
+RENDER_CHUNK_SIZE = 25
+
+
+def _render_result(card_id, status, uid=None, url=None, error=None):
+    return {
+        "id": card_id,
+        "uid": str(uid) if uid else None,
+        "status": status,
+        "url": url,
+        "error": error,
+    }
+
+
+def render_one(card_id, fetcher=None, force=False):
+    """
+    Render a single IDCard by primary key and describe the outcome.
+    Never raises: errors are reported in the result.
+    """
+    from idcards.models import IDCard
+
+    try:
+        with transaction.atomic():
+            idcard = (
+                IDCard.objects.select_for_update()
+                .select_related("student")
+                .filter(pk=card_id)
+                .first()
+            )
+
+            if not idcard:
+                return _render_result(card_id, RENDER_SKIPPED, error="IDCard not found")
+
+            if idcard.has_image and not force:
+                return _render_result(card_id, RENDER_EXISTS, idcard.uid, idcard.image.url)
+
+            result = generate_id_card(idcard, fetcher=fetcher, force=force)
+
+        if isinstance(result, (bytes, bytearray)):
+            return _render_result(card_id, RENDER_FAILOVER, idcard.uid)
+
+        if result:
+            return _render_result(card_id, RENDER_RENDERED, idcard.uid, result)
+
+        return _render_result(card_id, RENDER_SKIPPED, idcard.uid)
+
+    except Exception as e:
+        print("GENERATOR: BATCH RENDER FAILED:", card_id, str(e))
+        return _render_result(card_id, RENDER_ERROR, error=str(e))
+
+
+def _passport_resources(card_ids, force=False):
+    """
+    Map card id -> approved passport, in one query per batch.
+    Without `force`, cards render_one skips (image already
+    stored) are left out so their passports are not fetched.
+    """
+    from idcards.models import IDCard
+
+    cards = IDCard.objects.filter(pk__in=card_ids)
+    if not force:
+        cards = cards.filter(Q(image__isnull=True) | Q(image=""))
+
+    student_ids = dict(cards.values_list("pk", "student_id"))
+    applications = IDApplication.objects.filter(
+        student_id__in=student_ids.values(),
+        status=IDApplication.STATUS_APPROVED,
+    )
+
+    passports = {app.student_id: app.card_passport for app in applications if app.passport}
+
+    return {
+        card_id: passports.get(student_id)
+        for card_id, student_id in student_ids.items()
+    }
+
+
+def render_chunk(card_ids, force=False):
+    """
+    Render a run of cards in order, downloading upcoming
+    passports in the background while each card is composed.
+    """
+    try:
+        passports = _passport_resources(card_ids, force)
+    except Exception as e:
+        print("GENERATOR: PREFETCH PLAN FAILED:", str(e))
+        passports = {}
+
+    size = get_layout().passport_size or PASSPORT_SIZE
+
+    with PassportPrefetcher((passports.get(card_id) for card_id in card_ids), size=size) as prefetcher:
+        # Encode this chunk's QR codes while the passports download
+        _prime_qr_codes(card_ids, force)
+        return [render_one(card_id, fetcher=prefetcher, force=force) for card_id in card_ids]
+
+
+def _prime_qr_codes(card_ids, force=False):
+    from idcards.models import IDCard
+
+    try:
+        cards = IDCard.objects.filter(pk__in=card_ids).exclude(verify_token__isnull=True)
+        if not force:
+            cards = cards.filter(Q(image__isnull=True) | Q(image=""))
+
+        # Matrices only: compose rasterizes each code itself
+        prime_qr_matrices(build_verify_url(card) for card in cards)
+    except Exception as e:
+        print("GENERATOR: QR PRIME FAILED:", str(e))
+
+
+def _chunks(items, size):
+    for start in range(0, len(items), size):
+        yield items[start:start + size]
+
+
+# Default pool size cap when IDCARD_RENDER_WORKERS is unset
+MAX_DEFAULT_WORKERS = 4
+
+
+def available_cpus():
+    """
+    CPUs this process may run on. os.cpu_count() reports the
+    host's cores inside a container.
+    """
+    try:
+        return len(os.sched_getaffinity(0)) or 1
+    except AttributeError:
+        return os.cpu_count() or 1
+
+
+def request_render_workers():
+    """
+    Pool size for renders inside a web request (admin actions):
+    in-process unless IDCARD_RENDER_WORKERS asks for a pool.
+    """
+    return getattr(settings, "IDCARD_RENDER_WORKERS", None) or 1
+
+
+def _resolve_workers(workers, count):
+    if workers is None:
+        workers = getattr(settings, "IDCARD_RENDER_WORKERS", None) or min(available_cpus(), MAX_DEFAULT_WORKERS)
+    return max(1, min(int(workers), count))
+
+
+def render_many(idcards, workers=None, force=False):
+    """
+    Render many ID cards across a process pool.
+
+    Accepts IDCard instances or primary keys and returns one result
+    dict per card (see render_one), in input order. Runs in-process
+    when only one worker is available. `force` re-renders cards
+    that already have an image.
+    """
+    card_ids = [getattr(card, "pk", card) for card in idcards]
+
+    if not card_ids:
+        return []
+
+    workers = _resolve_workers(workers, len(card_ids))
+    print(f"GENERATOR: BATCH START cards={len(card_ids)} workers={workers}")
+
+    if workers == 1:
+        return render_chunk(card_ids, force)
+
+    from idcards import render_worker
+
+    # Chunks large enough to keep each worker's prefetcher busy,
+    # small enough to balance load across the pool.
+    chunk_size = max(1, min(RENDER_CHUNK_SIZE, -(-len(card_ids) // workers)))
+    results = []
+
+    # spawn: never fork a threaded gunicorn worker
+    with ProcessPoolExecutor(
+        max_workers=workers,
+        mp_context=multiprocessing.get_context("spawn"),
+        initializer=render_worker.init_worker,
+    ) as pool:
+        chunks = list(_chunks(card_ids, chunk_size))
+        futures = [pool.submit(render_worker.render_cards, chunk, force) for chunk in chunks]
+
+        for chunk, future in zip(chunks, futures):
+            try:
+                results.extend(future.result())
+            except Exception as e:
+                results.extend(
+                    _render_result(card_id, RENDER_ERROR, error=str(e))
+                    for card_id in chunk
+                )
+
+    return results
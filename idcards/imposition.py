@@ -0,0 +1,212 @@
+import os
+from itertools import islice
+
+from django.conf import settings
+from reportlab.lib.pagesizes import A4
+from reportlab.lib.units import mm
+from reportlab.pdfgen import canvas as pdf_canvas
+
+from applications.models import IDApplication
+from idcards.generator import build_verify_url, get_student_details
+from idcards.layers import PASSPORT_SIZE, passport_layer
+from idcards.layout import get_layout
+from idcards.passports import PassportPrefetcher
+from idcards.pdf import CR80_HEIGHT, CR80_WIDTH, draw_card
+
+
+SHEETS = {
+    "A4": A4,
+    "SRA3": (320 * mm, 450 * mm),
+}
+
+SHEET_MARGIN = 10 * mm
+CARD_GAP = 6 * mm          # room for both neighbours' crop marks
+MARK_OFFSET = 1 * mm
+MARK_LENGTH = 3 * mm
+
+SHEETS_PER_FILE = 100
+
+
+# =====================================================
+# PRINTABLE CARDS
+# Approved, active, unrevoked cards in print order
+# (department, level, matric) so each stack of sheets
+# can go straight to its faculty.
+# =====================================================
+def printable_cards(queryset=None, department=None, level=None, since=None, until=None):
+    """
+    `since` / `until` are dates, matched against the application's
+    approval (review) date, inclusive.
+    """
+    from idcards.models import IDCard
+
+    cards = (queryset if queryset is not None else IDCard.objects.all()).filter(
+        is_active=True,
+        is_revoked=False,
+        student__id_application__status=IDApplication.STATUS_APPROVED,
+    )
+
+    if department:
+        cards = cards.filter(student__department__iexact=department)
+    if level:
+        cards = cards.filter(student__level__iexact=level)
+    if since:
+        cards = cards.filter(student__id_application__reviewed_at__date__gte=since)
+    if until:
+        cards = cards.filter(student__id_application__reviewed_at__date__lte=until)
+
+    return cards.select_related("student", "student__id_application").order_by(
+        "student__department", "student__level", "student__matric_number"
+    )
+
+
+# =====================================================
+# SHEET GEOMETRY
+# =====================================================
+def sheet_positions(page, gap=CARD_GAP, margin=SHEET_MARGIN):
+    """
+    Bottom-left corners of every card slot on `page`, centred,
+    filled left to right from the top row.
+    """
+    width, height = page
+    cols = int((width - 2 * margin + gap) // (CR80_WIDTH + gap))
+    rows = int((height - 2 * margin + gap) // (CR80_HEIGHT + gap))
+
+    if cols < 1 or rows < 1:
+        raise ValueError("Sheet too small for a CR80 card")
+
+    left = (width - (cols * CR80_WIDTH + (cols - 1) * gap)) / 2
+    bottom = (height - (rows * CR80_HEIGHT + (rows - 1) * gap)) / 2
+
+    return [
+        (left + col * (CR80_WIDTH + gap), bottom + (rows - 1 - row) * (CR80_HEIGHT + gap))
+        for row in range(rows)
+        for col in range(cols)
+    ]
+
+
+def draw_crop_marks(c, x, y, width=CR80_WIDTH, height=CR80_HEIGHT):
+    """
+    Hairline marks on the trim lines, just outside each corner.
+    """
+    c.saveState()
+    c.setLineWidth(0.25)
+    c.setStrokeColorRGB(0, 0, 0)
+
+    for cx, dx in ((x, -1), (x + width, 1)):
+        for cy, dy in ((y, -1), (y + height, 1)):
+            c.line(cx + dx * MARK_OFFSET, cy, cx + dx * (MARK_OFFSET + MARK_LENGTH), cy)
+            c.line(cx, cy + dy * MARK_OFFSET, cx, cy + dy * (MARK_OFFSET + MARK_LENGTH))
+
+    c.restoreState()
+
+
+def cards_per_sheet(sheet="A4"):
+    return len(sheet_positions(SHEETS[sheet]))
+
+
+def sheets_per_file():
+    return max(1, int(getattr(settings, "IDCARD_PRINT_SHEETS_PER_FILE", SHEETS_PER_FILE)))
+
+
+# =====================================================
+# IMPOSITION (STREAMED, ONE SHEET AT A TIME)
+# Cards are read lazily and their passports fetched one
+# sheet ahead; nothing but the PDF under construction
+# outlives a sheet. ReportLab keeps a document in memory
+# until it is saved, so large batches are split into
+# volumes of at most sheets_per_file() sheets.
+# =====================================================
+def _groups(items, size):
+    items = iter(items)
+    while True:
+        group = list(islice(items, size))
+        if not group:
+            return
+        yield group
+
+
+def impose_cards(cards, out, sheet="A4", crop_marks=True, title="EKSU ID cards"):
+    """
+    Lay `cards` (IDCard instances, student and approved application
+    selected) N-up onto `sheet` pages and write the PDF to `out`, a
+    path or binary file object. Returns {"cards", "sheets", "skipped"}.
+    """
+    layout = get_layout()
+    size = layout.passport_size or PASSPORT_SIZE
+    positions = sheet_positions(SHEETS[sheet])
+
+    c = pdf_canvas.Canvas(out, pagesize=SHEETS[sheet], pageCompression=1)
+    c.setTitle(title)
+    c.setAuthor("Ekiti State University")
+
+    placed = sheets = slot = 0
+    skipped = []
+
+    def finish_sheet():
+        c.setFont("Helvetica", 7)
+        c.drawString(SHEET_MARGIN, SHEET_MARGIN / 2, f"{title} - sheet {sheets + 1}")
+        c.showPage()
+
+    for group in _groups(cards, len(positions)):
+        resources = [getattr(card.student, "id_application", None) for card in group]
+        resources = [app.card_passport if app else None for app in resources]
+
+        with PassportPrefetcher(resources, size=size) as prefetcher:
+            for card, resource in zip(group, resources):
+                passport = passport_layer(resource, fetcher=prefetcher, size=size) if resource else None
+
+                if passport is None:
+                    print("PRINT: NO PASSPORT", card.pk)
+                    skipped.append(card.pk)
+                    continue
+
+                x, y = positions[slot]
+                draw_card(c, passport, get_student_details(card.student), build_verify_url(card), x, y, layout=layout)
+                if crop_marks:
+                    draw_crop_marks(c, x, y)
+
+                placed += 1
+                slot += 1
+
+                if slot == len(positions):
+                    finish_sheet()
+                    sheets += 1
+                    slot = 0
+
+    if slot or not sheets:
+        finish_sheet()
+        sheets += 1
+
+    c.save()
+    print(f"PRINT: {placed} cards on {sheets} {sheet} sheets, {len(skipped)} skipped")
+
+    return {"cards": placed, "sheets": sheets, "skipped": skipped}
+
+
+def impose_to_files(cards, path, total, sheet="A4", crop_marks=True, title="EKSU ID cards"):
+    """
+    Write `total` cards to `path`, or to numbered volumes beside it
+    (name-001.pdf, ...) when they need more than sheets_per_file()
+    sheets. Returns a list of (path, result).
+    """
+    per_file = cards_per_sheet(sheet) * sheets_per_file()
+
+    if total <= per_file:
+        return [(path, impose_cards(cards, path, sheet, crop_marks, title))]
+
+    stem, ext = os.path.splitext(path)
+    volumes = []
+
+    for number, group in enumerate(_groups(cards, per_file), start=1):
+        volume = f"{stem}-{number:03d}{ext or '.pdf'}"
+        result = impose_cards(group, volume, sheet, crop_marks, f"{title} ({number})")
+
+        # Every passport in the volume failed: no blank file
+        if not result["cards"]:
+            os.remove(volume)
+            volume = None
+
+        volumes.append((volume, result))
+
+    return volumes
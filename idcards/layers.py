@@ -0,0 +1,165 @@
+import hashlib
+import threading
+from collections import OrderedDict
+from io import BytesIO
+
+from PIL import Image, ImageDraw
+
+from idcards.memory import bounded_render, passport_max_pixels
+from idcards.passports import get_passport_bytes, get_passport_cache, passport_cache_key
+from idcards.sandbox import run_sandboxed, sandbox_enabled
+from idcards.sandbox_worker import decode_image, decode_image_pixels
+
+
+PASSPORT_SIZE = (220, 260)
+
+
+# =====================================================
+# IN-PROCESS LAYER CACHE (BOUNDED LRU)
+# A card is base template + placed passport + text lines
+# + QR. Each layer is cached on its own inputs, so a
+# token rotation only re-encodes the QR and a level edit
+# only re-rasterizes one text line.
+# =====================================================
+class LayerCache:
+
+    def __init__(self, name, max_entries):
+        self.name = name
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self._items = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            value = self._items.get(key)
+            if value is None:
+                self.misses += 1
+                return None
+            self._items.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def put(self, key, value):
+        with self._lock:
+            self._items[key] = value
+            self._items.move_to_end(key)
+            while len(self._items) > self.max_entries:
+                self._items.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._items.clear()
+
+    def stats(self):
+        with self._lock:
+            return {
+                "entries": len(self._items),
+                "max_entries": self.max_entries,
+                "hits": self.hits,
+                "misses": self.misses,
+            }
+
+
+PASSPORT_LAYERS = LayerCache("passport", 64)
+TEXT_LAYERS = LayerCache("text", 512)
+
+
+def layer_cache_stats():
+    return {cache.name: cache.stats() for cache in (PASSPORT_LAYERS, TEXT_LAYERS)}
+
+
+# =====================================================
+# PLACED PASSPORT LAYER
+# Memory first, then the resized copy kept beside the
+# original in the passport cache, then a download of the
+# card-sized derivative (or the original as a fallback).
+# =====================================================
+def _passport_layer_key(resource, size):
+    source = f"{passport_cache_key(resource)}:layer:{size[0]}x{size[1]}"
+    return hashlib.sha256(source.encode("utf-8")).hexdigest()
+
+
+def decode_passport(data, size):
+    """
+    Decode passport bytes straight to `size` (see
+    sandbox_worker.decode_image). Runs in the sandbox when
+    IDCARD_RENDER_SANDBOX is on; SandboxError reports a passport
+    that failed, hit a limit or timed out there.
+    """
+    max_pixels = passport_max_pixels()
+
+    if sandbox_enabled():
+        mode, decoded_size, pixels = run_sandboxed(decode_image_pixels, data, size, max_pixels)
+        return Image.frombytes(mode, decoded_size, pixels)
+
+    with bounded_render():
+        return decode_image(data, size, max_pixels)
+
+
+def passport_layer(resource, fetcher=None, size=PASSPORT_SIZE):
+    """
+    Passport resized for the card, or None when it cannot be loaded.
+    `fetcher` is an optional PassportPrefetcher.
+    """
+    key = _passport_layer_key(resource, size)
+
+    layer = PASSPORT_LAYERS.get(key)
+    if layer is not None:
+        return layer
+
+    disk = get_passport_cache()
+    data = disk.get(key, kind="layer")
+
+    if data is not None:
+        try:
+            layer = Image.open(BytesIO(data))
+            layer.load()
+        except Exception:
+            layer = None
+
+    if layer is None:
+        data = fetcher.get(resource) if fetcher else get_passport_bytes(resource, size)
+        if not data:
+            return None
+
+        layer = decode_passport(data, size)
+
+        buffer = BytesIO()
+        layer.save(buffer, format="PNG", compress_level=1)
+        disk.put(key, buffer.getvalue())
+
+    PASSPORT_LAYERS.put(key, layer)
+    return layer
+
+
+# =====================================================
+# TEXT LINE LAYER
+# One greyscale mask per (text, font). Pasting black
+# through the mask matches ImageDraw.text pixel for pixel.
+# =====================================================
+def _font_key(font):
+    path = getattr(font, "path", None)
+    return (path, getattr(font, "size", None)) if path else ("id", id(font))
+
+
+def text_layer(text, font):
+    key = (text, _font_key(font))
+
+    mask = TEXT_LAYERS.get(key)
+    if mask is not None:
+        return mask
+
+    left, top, right, bottom = font.getbbox(text)
+    mask = Image.new("L", (max(1, right), max(1, bottom)), 0)
+    ImageDraw.Draw(mask).text((0, 0), text, font=font, fill=255)
+
+    TEXT_LAYERS.put(key, mask)
+    return mask
+
+
+def paste_text(card, xy, text, font, fill=(0, 0, 0)):
+    mask = text_layer(text, font)
+    x, y = xy
+    card.paste(fill, (x, y, x + mask.width, y + mask.height), mask)
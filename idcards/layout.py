@@ -0,0 +1,250 @@
+import hashlib
+import os
+import threading
+
+import yaml
+from django.conf import settings
+from PIL import ImageColor, ImageFont
+
+from idcards.textfit import font_metrics
+
+
+# Order matches generator.get_student_details()
+DETAIL_FIELDS = ("full_name", "matric", "department", "level", "phone")
+
+DEFAULT_LAYOUT_SPEC = os.path.join(os.path.dirname(__file__), "layouts", "default.yaml")
+
+
+class LayoutError(ValueError):
+    pass
+
+
+# =====================================================
+# COMPILED LAYOUT (FLAT DRAW PLAN)
+# The YAML spec is resolved once per process: fonts are
+# loaded, colours parsed, labels measured. Rendering
+# only walks the tuples below.
+#
+# static_ops: ("rect", box, fill)
+#             ("text", xy, text, font, fill)
+#             ("watermark", path, scale, opacity)
+# field_ops:  ("passport", xy, size)
+#             ("text", xy, detail_index, font, fill, fit)
+#             ("qr", xy, size)
+#
+# `fit` is None or the textfit.fit_text arguments after
+# the text: (font_path, max_size, min_size, width, height,
+# baseline) for the value's box.
+# =====================================================
+class CompiledLayout:
+
+    def __init__(self, spec_path, checksum, size, background, static_ops, field_ops, asset_paths):
+        self.spec_path = spec_path
+        self.checksum = checksum
+        self.size = size
+        self.background = background
+        self.static_ops = static_ops
+        self.field_ops = field_ops
+        self.asset_paths = asset_paths
+        self.stamp = file_stamps(asset_paths)
+
+    def _field(self, kind):
+        return next((op for op in self.field_ops if op[0] == kind), None)
+
+    @property
+    def passport_size(self):
+        op = self._field("passport")
+        return op[2] if op else None
+
+    @property
+    def qr_size(self):
+        op = self._field("qr")
+        return op[2] if op else None
+
+    def is_current(self):
+        return self.spec_path == layout_spec_path() and self.stamp == file_stamps(self.asset_paths)
+
+
+def file_stamps(paths):
+    stamps = []
+    for path in paths:
+        try:
+            stat = os.stat(path)
+            stamps.append((path, stat.st_mtime_ns, stat.st_size))
+        except OSError:
+            stamps.append((path, None, None))
+    return tuple(stamps)
+
+
+def layout_spec_path():
+    return str(getattr(settings, "IDCARD_LAYOUT_SPEC", "") or DEFAULT_LAYOUT_SPEC)
+
+
+# =====================================================
+# COMPILER
+# =====================================================
+def _resolve_path(path):
+    return path if os.path.isabs(path) else os.path.join(settings.BASE_DIR, path)
+
+
+def _colour(value):
+    try:
+        return ImageColor.getrgb(str(value))
+    except ValueError:
+        raise LayoutError(f"Invalid colour: {value!r}")
+
+
+def _pair(value, name):
+    if not isinstance(value, (list, tuple)) or len(value) != 2:
+        raise LayoutError(f"{name} must be [x, y]")
+    return int(value[0]), int(value[1])
+
+
+def _load_font(path, size):
+    try:
+        return ImageFont.truetype(path, size)
+    except Exception:
+        print("LAYOUT: FONT LOAD FAILED", path)
+        return ImageFont.load_default()
+
+
+def compile_layout(spec, spec_path, checksum=""):
+    if not isinstance(spec, dict):
+        raise LayoutError("Layout spec must be a mapping")
+
+    canvas = spec.get("canvas") or {}
+    size = (int(canvas.get("width", 1010)), int(canvas.get("height", 640)))
+    background = _colour(canvas.get("background", "#ffffff"))
+
+    asset_paths = [spec_path]
+    fonts = {}
+    for name, font_spec in (spec.get("fonts") or {}).items():
+        path = _resolve_path(font_spec["path"])
+        fonts[name] = _load_font(path, int(font_spec["size"]))
+        asset_paths.append(path)
+
+    def font(name):
+        if name not in fonts:
+            raise LayoutError(f"Unknown font: {name!r}")
+        return fonts[name]
+
+    static_ops = []
+    for op in spec.get("static") or []:
+        kind = op.get("type")
+
+        if kind == "rect":
+            static_ops.append(("rect", tuple(int(v) for v in op["box"]), _colour(op["fill"])))
+        elif kind == "text":
+            static_ops.append(
+                ("text", _pair(op["xy"], "xy"), str(op["text"]), font(op["font"]), _colour(op["fill"]))
+            )
+        elif kind == "watermark":
+            path = _resolve_path(op["path"])
+            static_ops.append(
+                ("watermark", path, float(op.get("scale", 0.35)), float(op.get("opacity", 0.06)))
+            )
+            asset_paths.append(path)
+        else:
+            raise LayoutError(f"Unknown static op: {kind!r}")
+
+    field_ops = []
+    labels = []
+    for op in spec.get("fields") or []:
+        kind = op.get("type")
+
+        if kind == "passport":
+            field_ops.append(("passport", _pair(op["xy"], "xy"), _pair(op["size"], "size")))
+        elif kind == "qr":
+            field_ops.append(("qr", _pair(op["xy"], "xy"), int(op["size"])))
+        elif kind == "text":
+            if op.get("field") not in DETAIL_FIELDS:
+                raise LayoutError(f"Unknown text field: {op.get('field')!r}")
+
+            x, y = _pair(op["xy"], "xy")
+            text_font = font(op["font"])
+            fill = _colour(op["fill"])
+            label = str(op.get("label") or "")
+            label_width = 0
+
+            if label:
+                labels.append(("text", (x, y), label, text_font, fill))
+                label_width = round(text_font.getlength(label))
+                x += label_width
+
+            fit = None
+            font_path = getattr(text_font, "path", None)
+            if op.get("box") and font_path:
+                box_width, box_height = _pair(op["box"], "box")
+                max_size = int(text_font.size)
+                fit = (
+                    font_path,
+                    max_size,
+                    min(max_size, int(op.get("min_size", max_size))),
+                    box_width - label_width,
+                    box_height,
+                    font_metrics(font_path, max_size)[0],
+                )
+
+            field_ops.append(("text", (x, y), DETAIL_FIELDS.index(op["field"]), text_font, fill, fit))
+        else:
+            raise LayoutError(f"Unknown field op: {kind!r}")
+
+    # Labels sit above the watermark, like the values
+    static_ops.extend(labels)
+
+    return CompiledLayout(
+        spec_path,
+        checksum,
+        size,
+        background,
+        static_ops,
+        field_ops,
+        list(dict.fromkeys(asset_paths)),
+    )
+
+
+def load_layout(spec_path):
+    try:
+        with open(spec_path, "rb") as f:
+            raw = f.read()
+        spec = yaml.safe_load(raw)
+    except (OSError, yaml.YAMLError) as e:
+        raise LayoutError(f"Cannot read layout spec {spec_path}: {e}")
+
+    try:
+        return compile_layout(spec, spec_path, hashlib.sha256(raw).hexdigest())
+    except (KeyError, TypeError) as e:
+        raise LayoutError(f"Malformed layout spec {spec_path}: {e}")
+
+
+# =====================================================
+# HOT-RELOADING ACCESSOR
+# Recompiled when the spec or any asset it names changes.
+# A broken edit keeps the last good layout in service.
+# =====================================================
+_layout = None
+_layout_lock = threading.Lock()
+
+
+def get_layout():
+    global _layout
+
+    layout = _layout
+    if layout is not None and layout.is_current():
+        return layout
+
+    with _layout_lock:
+        if _layout is not None and _layout.is_current():
+            return _layout
+
+        try:
+            _layout = load_layout(layout_spec_path())
+            print("LAYOUT: COMPILED", _layout.spec_path)
+        except LayoutError as e:
+            if _layout is None:
+                raise
+            print("LAYOUT: RELOAD FAILED, KEEPING PREVIOUS:", str(e))
+            # Do not retry on every render until the files change again
+            _layout.stamp = file_stamps(_layout.asset_paths)
+
+        return _layout
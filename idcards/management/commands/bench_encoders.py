@@ -0,0 +1,74 @@
+import json
+import statistics
+import time
+
+from django.core.management.base import BaseCommand
+
+from idcards.encoders import ENCODERS
+from idcards.generator import compose_card
+from idcards.synthetic import synthetic_details, synthetic_passport, synthetic_verify_url
+
+
+class Command(BaseCommand):
+    help = "Compare card image encoders: encode time and output size"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--repeat", type=int, default=5, help="Encodes per card and encoder")
+        parser.add_argument("--cards", type=int, default=3, help="Distinct synthetic cards")
+        parser.add_argument(
+            "--encoder",
+            action="append",
+            choices=sorted(ENCODERS),
+            help="Limit to these encoders (repeatable)",
+        )
+        parser.add_argument("--json", dest="json_path", help="Also write results to this file")
+
+    def handle(self, *args, **options):
+        names = options["encoder"] or list(ENCODERS)
+        repeat = max(1, options["repeat"])
+
+        cards = [
+            compose_card(
+                synthetic_passport(seed=i).resize((220, 260)),
+                synthetic_details(i),
+                synthetic_verify_url(i),
+            )
+            for i in range(max(1, options["cards"]))
+        ]
+
+        results = []
+
+        for name in names:
+            encoder = ENCODERS[name]
+            timings = []
+            sizes = []
+
+            for card in cards:
+                for _ in range(repeat):
+                    start = time.perf_counter()
+                    data = encoder.encode(card)
+                    timings.append((time.perf_counter() - start) * 1000)
+                sizes.append(len(data))
+
+            results.append({
+                "encoder": name,
+                "content_type": encoder.content_type,
+                "encode_ms_p50": round(statistics.median(timings), 2),
+                "encode_ms_max": round(max(timings), 2),
+                "bytes_avg": int(statistics.mean(sizes)),
+            })
+
+        baseline = next((r["bytes_avg"] for r in results if r["encoder"] == "png"), None)
+
+        self.stdout.write(f"{'ENCODER':<15}{'P50 MS':>10}{'MAX MS':>10}{'BYTES':>12}{'VS PNG':>9}")
+        for row in results:
+            ratio = f"{row['bytes_avg'] / baseline:.2f}x" if baseline else "-"
+            self.stdout.write(
+                f"{row['encoder']:<15}{row['encode_ms_p50']:>10}{row['encode_ms_max']:>10}"
+                f"{row['bytes_avg']:>12}{ratio:>9}"
+            )
+
+        if options["json_path"]:
+            with open(options["json_path"], "w", encoding="utf-8") as f:
+                json.dump({"repeat": repeat, "cards": len(cards), "results": results}, f, indent=2)
+            self.stdout.write(self.style.SUCCESS(f"Wrote {options['json_path']}"))
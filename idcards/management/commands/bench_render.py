@@ -0,0 +1,154 @@
+import json
+import multiprocessing
+import platform
+import shutil
+import statistics
+import subprocess
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import PIL
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from idcards.encoders import ENCODERS, get_encoder
+from idcards.timing import STAGES
+
+
+def _percentiles(values):
+    if len(values) < 2:
+        value = round(values[0], 2) if values else 0.0
+        return value, value, value
+
+    cuts = statistics.quantiles(values, n=100, method="inclusive")
+    return round(cuts[49], 2), round(cuts[94], 2), round(cuts[98], 2)
+
+
+def _summary(values):
+    p50, p95, p99 = _percentiles(values)
+    return {
+        "count": len(values),
+        "mean_ms": round(statistics.mean(values), 2) if values else 0.0,
+        "p50_ms": p50,
+        "p95_ms": p95,
+        "p99_ms": p99,
+        "max_ms": round(max(values), 2) if values else 0.0,
+    }
+
+
+def _git_revision():
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            cwd=settings.BASE_DIR,
+            capture_output=True,
+            text=True,
+            timeout=5,
+        ).stdout.strip() or None
+    except Exception:
+        return None
+
+
+class Command(BaseCommand):
+    help = "Render synthetic ID cards end to end: throughput, per-stage latency, memory, bytes"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--cards", type=int, default=200, help="Cards to render")
+        parser.add_argument("--workers", type=int, default=1, help="Render processes (1 = in-process)")
+        parser.add_argument("--passports", type=int, default=16, help="Distinct synthetic passports")
+        parser.add_argument("--encoder", choices=sorted(ENCODERS), help="Override IDCARD_IMAGE_ENCODER")
+        parser.add_argument(
+            "--trace-memory",
+            action="store_true",
+            help="Measure each card's Python peak with tracemalloc (slower)",
+        )
+        parser.add_argument("--keep", action="store_true", help="Keep the rendered cards on disk")
+        parser.add_argument("--json", dest="json_path", help="Also write results to this file")
+
+    def handle(self, *args, **options):
+        count = max(1, options["cards"])
+        workers = max(1, min(options["workers"], count))
+        encoder = get_encoder(options["encoder"])
+        storage_dir = tempfile.mkdtemp(prefix="bench_render_")
+        job = (storage_dir, encoder.name, options["passports"], options["trace_memory"])
+
+        self.stdout.write(f"Rendering {count} cards with {workers} worker(s), encoder={encoder.name}")
+
+        try:
+            started = time.perf_counter()
+            chunks = self._run(list(range(count)), workers, job)
+            wall = time.perf_counter() - started
+        finally:
+            if options["keep"]:
+                self.stdout.write(f"Cards kept in {storage_dir}")
+            else:
+                shutil.rmtree(storage_dir, ignore_errors=True)
+
+        records = [record for chunk in chunks for record in chunk["records"]]
+        sizes = [record["bytes"] for record in records]
+        python_peaks = [record["python_peak"] for record in records if record["python_peak"] is not None]
+
+        report = {
+            "revision": _git_revision(),
+            "python": platform.python_version(),
+            "pillow": PIL.__version__,
+            "cards": len(records),
+            "workers": workers,
+            "encoder": encoder.name,
+            "low_memory": bool(getattr(settings, "IDCARD_RENDER_LOW_MEMORY", False)),
+            "wall_s": round(wall, 3),
+            "cards_per_s": round(len(records) / wall, 2) if wall else None,
+            "total": _summary([record["total_ms"] for record in records]),
+            "stages": {
+                stage: _summary([record["stages"].get(stage, 0.0) for record in records])
+                for stage in STAGES
+            },
+            "bytes_total": sum(sizes),
+            "bytes_avg": int(statistics.mean(sizes)) if sizes else 0,
+            "rss_peak_bytes": max(chunk["rss_peak"] for chunk in chunks),
+            "python_peak_bytes": max(python_peaks) if python_peaks else None,
+        }
+
+        self._print(report)
+
+        if options["json_path"]:
+            with open(options["json_path"], "w", encoding="utf-8") as f:
+                json.dump(report, f, indent=2)
+            self.stdout.write(self.style.SUCCESS(f"Wrote {options['json_path']}"))
+
+    def _run(self, indices, workers, job):
+        from idcards import render_worker
+
+        if workers == 1:
+            return [render_worker.bench_cards(indices, *job)]
+
+        # Same pool shape as generator.render_many
+        size = -(-len(indices) // workers)
+        with ProcessPoolExecutor(
+            max_workers=workers,
+            mp_context=multiprocessing.get_context("spawn"),
+            initializer=render_worker.init_worker,
+        ) as pool:
+            futures = [
+                pool.submit(render_worker.bench_cards, indices[start:start + size], *job)
+                for start in range(0, len(indices), size)
+            ]
+            return [future.result() for future in futures]
+
+    def _print(self, report):
+        self.stdout.write(
+            f"{report['cards']} cards in {report['wall_s']}s = {report['cards_per_s']} cards/s"
+        )
+        self.stdout.write(f"{'STAGE':<10}{'P50 MS':>10}{'P95 MS':>10}{'P99 MS':>10}{'MAX MS':>10}")
+
+        for name, row in [*report["stages"].items(), ("total", report["total"])]:
+            self.stdout.write(
+                f"{name:<10}{row['p50_ms']:>10}{row['p95_ms']:>10}{row['p99_ms']:>10}{row['max_ms']:>10}"
+            )
+
+        self.stdout.write(f"Output: {report['bytes_total']} bytes ({report['bytes_avg']} per card)")
+        self.stdout.write(f"Peak RSS (largest process): {report['rss_peak_bytes'] // 1024} KB")
+
+        if report["python_peak_bytes"] is not None:
+            self.stdout.write(f"Peak Python allocation per card: {report['python_peak_bytes'] // 1024} KB")
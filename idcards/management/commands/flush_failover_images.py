@@ -0,0 +1,45 @@
+from django.core.management.base import BaseCommand
+
+from idcards.failover import FLUSH_FAILED, FLUSH_STALE, FLUSH_UPLOADED, flush_failover_image, pending_failover_images
+
+
+class Command(BaseCommand):
+    help = "Upload card images stored during a storage outage (run from cron until none are left)"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--limit", type=int, default=0, help="At most this many images")
+        parser.add_argument(
+            "--max-attempts",
+            type=int,
+            default=0,
+            help="Skip images that already failed this many times (0 = no limit)",
+        )
+
+    def handle(self, *args, **options):
+        records = pending_failover_images()
+
+        if options["max_attempts"]:
+            records = records.filter(attempts__lt=options["max_attempts"])
+        if options["limit"]:
+            records = records[:options["limit"]]
+
+        counts = {FLUSH_UPLOADED: 0, FLUSH_STALE: 0, FLUSH_FAILED: 0}
+
+        for record in records.iterator(chunk_size=50):
+            try:
+                status = flush_failover_image(record)
+            except Exception as e:
+                status = FLUSH_FAILED
+                self.stderr.write(f"FAILED card {record.card_id}: {e}")
+
+            counts[status] += 1
+
+            if status == FLUSH_FAILED:
+                self.stderr.write(f"FAILED card {record.card_id}: upload failed")
+
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Done. Uploaded={counts[FLUSH_UPLOADED]}, Stale={counts[FLUSH_STALE]}, "
+                f"Failed={counts[FLUSH_FAILED]}, Pending={pending_failover_images().count()}"
+            )
+        )
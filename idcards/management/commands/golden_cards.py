@@ -0,0 +1,225 @@
+import json
+import os
+from io import BytesIO
+
+import numpy as np
+from django.core.management.base import BaseCommand, CommandError
+from django.test import override_settings
+from PIL import Image
+
+from idcards.encoders import ENCODERS, get_encoder
+from idcards.generator import compose_card
+from idcards.layers import PASSPORT_SIZE, decode_passport
+from idcards.layout import DEFAULT_LAYOUT_SPEC, get_layout
+from idcards.synthetic import synthetic_passport, synthetic_verify_url
+from idcards.timing import RenderTimer
+
+
+GOLDEN_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(__file__))), "golden")
+
+# Per-channel difference allowed (0-255) and fraction of pixels
+# allowed beyond it; shared with idcards.tests
+GOLDEN_TOLERANCE = 8
+GOLDEN_MAX_MISMATCH = 0.001
+
+
+# =====================================================
+# GOLDEN CASES
+# Fixed students covering the layout's edge cases. Adding
+# a case needs a `golden_cards --update` run; changing one
+# invalidates its reference image.
+# =====================================================
+GOLDEN_CASES = [
+    {
+        "name": "standard",
+        "seed": 1,
+        "details": ("ADEBAYO OLUWASEUN BABATUNDE", "EKSU/2023/0001", "COMPUTER SCIENCE", "200", "08012345678"),
+        "verify": 1,
+    },
+    {
+        "name": "short-name",
+        "seed": 2,
+        "details": ("CHIAMAKA OKONKWO", "EKSU/2021/0420", "LAW", "100", "07030000000"),
+        "verify": 2,
+    },
+    {
+        "name": "long-name-shrunk",
+        "seed": 3,
+        "details": (
+            "ADEBAYO OLUWASEUN BABATUNDE OKONKWO",
+            "EKSU/2022/1234",
+            "PUBLIC ADMINISTRATION",
+            "300",
+            "08099999999",
+        ),
+        "verify": 3,
+    },
+    {
+        "name": "long-name-wrapped",
+        "seed": 4,
+        "details": (
+            "OLUWADAMILOLA TEMITOPE ADEYEMI-OGUNLEYE OLUWASEGUN",
+            "EKSU/2020/0007",
+            "GUIDANCE AND COUNSELLING EDUCATION",
+            "500",
+            "09012345678",
+        ),
+        "verify": 4,
+    },
+    {
+        "name": "missing-fields",
+        "seed": 5,
+        "details": ("IBRAHIM MUHAMMAD", "EKSU/2024/0100", "", "", ""),
+        "verify": 5,
+    },
+    {
+        "name": "no-qr",
+        "seed": 6,
+        "details": ("FUNMILAYO ADEOLA", "EKSU/2023/0555", "INDUSTRIAL CHEMISTRY", "400", "08055555555"),
+        "verify": None,
+    },
+]
+
+
+def render_case(case, encoder):
+    """
+    Render one golden case through decode -> compose -> encode
+    and decode the result back to pixels. Returns (image, timing).
+    """
+    # Lossless source so only the render path can move pixels
+    source = BytesIO()
+    synthetic_passport(case["seed"]).save(source, format="PNG", compress_level=1)
+
+    verify_url = synthetic_verify_url(case["verify"]) if case["verify"] is not None else None
+    timer = RenderTimer(case["name"])
+
+    with timer.stage("passport"):
+        passport = decode_passport(source.getvalue(), get_layout().passport_size or PASSPORT_SIZE)
+
+    with timer.stage("compose"):
+        card = compose_card(passport, case["details"], verify_url, timer=timer)
+
+    with timer.stage("encode"):
+        data = encoder.encode(card)
+
+    timer.status = "rendered"
+    image = Image.open(BytesIO(data)).convert("RGB")
+    return image, timer.record()
+
+
+def pixel_diff(actual, expected, tolerance):
+    """
+    Vectorized comparison of two RGB images. A pixel mismatches
+    when any channel differs by more than `tolerance`.
+    """
+    if actual.size != expected.size:
+        return {"max_diff": 255, "mismatched": None, "mismatch_ratio": 1.0, "mask": None}
+
+    a = np.asarray(actual, dtype=np.int16)
+    b = np.asarray(expected.convert("RGB"), dtype=np.int16)
+    delta = np.abs(a - b).max(axis=2)
+    mask = delta > tolerance
+
+    return {
+        "max_diff": int(delta.max()),
+        "mismatched": int(mask.sum()),
+        "mismatch_ratio": float(mask.mean()),
+        "mask": mask,
+    }
+
+
+class Command(BaseCommand):
+    help = "Render the golden ID card fixtures and compare them with the stored reference images"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--update", action="store_true", help="Rewrite the reference images")
+        parser.add_argument("--case", action="append", help="Only these cases (repeatable)")
+        parser.add_argument("--encoder", choices=sorted(ENCODERS), help="Override IDCARD_IMAGE_ENCODER")
+        parser.add_argument(
+            "--tolerance",
+            type=int,
+            default=GOLDEN_TOLERANCE,
+            help="Per-channel difference allowed (0-255)",
+        )
+        parser.add_argument(
+            "--max-mismatch",
+            type=float,
+            default=GOLDEN_MAX_MISMATCH,
+            help="Fraction of pixels allowed beyond the tolerance",
+        )
+        parser.add_argument("--diff-dir", help="Write a highlighted diff image for each failure here")
+        parser.add_argument("--json", dest="json_path", help="Also write results to this file")
+
+    def handle(self, *args, **options):
+        cases = [c for c in GOLDEN_CASES if not options["case"] or c["name"] in options["case"]]
+        if not cases:
+            raise CommandError("No matching golden cases")
+
+        encoder = get_encoder(options["encoder"])
+        results = []
+
+        # References describe the stock layout, whatever is deployed
+        with override_settings(IDCARD_LAYOUT_SPEC=DEFAULT_LAYOUT_SPEC):
+            for case in cases:
+                results.append(self._check(case, encoder, options))
+
+        self.stdout.write(f"{'CASE':<22}{'STATUS':<10}{'MAX DIFF':>10}{'MISMATCH %':>12}{'RENDER MS':>11}")
+        for row in results:
+            ratio = "-" if row["mismatch_ratio"] is None else f"{row['mismatch_ratio'] * 100:.3f}"
+            max_diff = "-" if row["max_diff"] is None else row["max_diff"]
+            self.stdout.write(
+                f"{row['case']:<22}{row['status']:<10}{max_diff:>10}{ratio:>12}{row['render_ms']:>11}"
+            )
+
+        if options["json_path"]:
+            with open(options["json_path"], "w", encoding="utf-8") as f:
+                json.dump({"encoder": encoder.name, "results": results}, f, indent=2)
+            self.stdout.write(self.style.SUCCESS(f"Wrote {options['json_path']}"))
+
+        failed = [row["case"] for row in results if row["status"] in ("FAIL", "MISSING")]
+        if failed:
+            raise CommandError(f"Golden mismatch: {', '.join(failed)}")
+
+        self.stdout.write(self.style.SUCCESS(f"{len(results)} golden cards OK"))
+
+    def _check(self, case, encoder, options):
+        actual, timing = render_case(case, encoder)
+        path = os.path.join(GOLDEN_DIR, f"{case['name']}.png")
+
+        row = {
+            "case": case["name"],
+            "status": "ok",
+            "max_diff": None,
+            "mismatch_ratio": None,
+            "render_ms": timing["total_ms"],
+            "stages": timing["stages"],
+        }
+
+        if options["update"]:
+            os.makedirs(GOLDEN_DIR, exist_ok=True)
+            actual.save(path, format="PNG", optimize=True)
+            row["status"] = "updated"
+            return row
+
+        if not os.path.exists(path):
+            row["status"] = "MISSING"
+            return row
+
+        with Image.open(path) as expected:
+            diff = pixel_diff(actual, expected, options["tolerance"])
+
+        row["max_diff"] = diff["max_diff"]
+        row["mismatch_ratio"] = round(diff["mismatch_ratio"], 6)
+
+        if diff["mismatch_ratio"] > options["max_mismatch"]:
+            row["status"] = "FAIL"
+            if options["diff_dir"] and diff["mask"] is not None:
+                self._write_diff(options["diff_dir"], case["name"], actual, diff["mask"])
+
+        return row
+
+    def _write_diff(self, diff_dir, name, actual, mask):
+        os.makedirs(diff_dir, exist_ok=True)
+        faded = (np.asarray(actual, dtype=np.uint16) + 255 * 3) // 4
+        faded[mask] = (255, 0, 0)
+        Image.fromarray(faded.astype(np.uint8), "RGB").save(os.path.join(diff_dir, f"{name}.diff.png"))
@@ -0,0 +1,90 @@
+from django.core.management.base import BaseCommand
+
+from applications.models import IDApplication
+from idcards.fingerprint import changed_inputs, compute_fingerprint
+from idcards.generator import current_render_inputs, render_many, RENDER_ERROR, RENDER_SKIPPED
+from idcards.models import IDCard
+
+
+class Command(BaseCommand):
+    help = "List ID cards whose render inputs changed and optionally re-render only those"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--apply", action="store_true", help="Re-render the stale cards")
+        parser.add_argument(
+            "--include-unknown",
+            action="store_true",
+            help="Also treat cards rendered before fingerprinting as stale",
+        )
+        parser.add_argument("--batch-size", type=int, default=200, help="Cards per render batch")
+        parser.add_argument("--workers", type=int, default=None, help="Render processes")
+        parser.add_argument("--quiet", action="store_true", help="Only print the summary")
+
+    def handle(self, *args, **options):
+        approved = {
+            app.student_id: app
+            for app in IDApplication.objects.filter(status=IDApplication.STATUS_APPROVED)
+        }
+
+        plan = {"missing": [], "stale": [], "unknown": [], "fresh": 0, "blocked": 0}
+
+        for card in IDCard.objects.select_related("student").iterator(chunk_size=500):
+            try:
+                inputs = current_render_inputs(card, approved.get(card.student_id))
+            except Exception as e:
+                self.stderr.write(f"FAILED {card.student}: {e}")
+                plan["blocked"] += 1
+                continue
+
+            if inputs is None:
+                plan["blocked"] += 1
+                continue
+
+            if not card.has_image:
+                plan["missing"].append(card.pk)
+                self._report(options, card, "MISSING")
+            elif not card.render_fingerprint:
+                plan["unknown"].append(card.pk)
+                self._report(options, card, "UNKNOWN")
+            elif card.render_fingerprint != compute_fingerprint(inputs):
+                plan["stale"].append(card.pk)
+                changed = ", ".join(changed_inputs(card.render_inputs, inputs))
+                self._report(options, card, f"STALE ({changed or 'inputs'})")
+            else:
+                plan["fresh"] += 1
+
+        targets = plan["missing"] + plan["stale"]
+        if options["include_unknown"]:
+            targets += plan["unknown"]
+
+        self.stdout.write(
+            f"Missing={len(plan['missing'])} Stale={len(plan['stale'])} "
+            f"Unknown={len(plan['unknown'])} Fresh={plan['fresh']} "
+            f"Blocked={plan['blocked']} ToRender={len(targets)}"
+        )
+
+        if not options["apply"] or not targets:
+            return
+
+        batch_size = max(1, options["batch_size"])
+        rendered = skipped = failed = 0
+
+        for start in range(0, len(targets), batch_size):
+            batch = targets[start:start + batch_size]
+
+            for result in render_many(batch, workers=options["workers"], force=True):
+                if result["status"] == RENDER_ERROR:
+                    failed += 1
+                    self.stderr.write(f"FAILED card {result['id']}: {result['error']}")
+                elif result["status"] == RENDER_SKIPPED:
+                    skipped += 1
+                else:
+                    rendered += 1
+
+            self.stdout.write(f"Batch {start // batch_size + 1}: {start + len(batch)}/{len(targets)}")
+
+        self.stdout.write(self.style.SUCCESS(f"Done. Rendered={rendered}, Skipped={skipped}, Failed={failed}"))
+
+    def _report(self, options, card, state):
+        if not options["quiet"]:
+            self.stdout.write(f"{state:<10} {card.student.matric_number} {card.uid}")
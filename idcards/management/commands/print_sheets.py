@@ -0,0 +1,60 @@
+from datetime import date
+
+from django.core.management.base import BaseCommand, CommandError
+
+from idcards.imposition import SHEETS, cards_per_sheet, impose_to_files, printable_cards
+
+
+def _date(value):
+    try:
+        return date.fromisoformat(value)
+    except ValueError:
+        raise CommandError(f"Invalid date (YYYY-MM-DD): {value}")
+
+
+class Command(BaseCommand):
+    help = "Lay approved ID cards out N-up on print sheets (PDF with crop marks)"
+
+    def add_arguments(self, parser):
+        parser.add_argument("output", help="PDF path; large batches become numbered volumes beside it")
+        parser.add_argument("--sheet", choices=sorted(SHEETS), default="A4")
+        parser.add_argument("--department", help="Only this department (case-insensitive)")
+        parser.add_argument("--level", help="Only this level")
+        parser.add_argument("--since", type=_date, help="Approved on or after (YYYY-MM-DD)")
+        parser.add_argument("--until", type=_date, help="Approved on or before (YYYY-MM-DD)")
+        parser.add_argument("--no-crop-marks", action="store_true")
+
+    def handle(self, *args, **options):
+        cards = printable_cards(
+            department=options["department"],
+            level=options["level"],
+            since=options["since"],
+            until=options["until"],
+        )
+
+        total = cards.count()
+        if not total:
+            raise CommandError("No approved cards match")
+
+        title = " ".join(
+            filter(None, ["EKSU ID cards", options["department"], options["level"] and f"{options['level']}L"])
+        )
+
+        self.stdout.write(f"{total} cards, {cards_per_sheet(options['sheet'])} per {options['sheet']} sheet")
+
+        volumes = impose_to_files(
+            cards.iterator(chunk_size=500),
+            options["output"],
+            total,
+            sheet=options["sheet"],
+            crop_marks=not options["no_crop_marks"],
+            title=title,
+        )
+
+        for path, result in volumes:
+            self.stdout.write(f"{path or '(not written)'}: {result['cards']} cards on {result['sheets']} sheets")
+            for card_id in result["skipped"]:
+                self.stderr.write(f"SKIPPED card {card_id}: passport unavailable")
+
+        written = [path for path, _ in volumes if path]
+        self.stdout.write(self.style.SUCCESS(f"Wrote {len(written)} file(s)"))
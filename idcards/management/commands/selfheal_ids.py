@@ -1,26 +1,35 @@
 from django.core.management.base import BaseCommand
 from idcards.models import IDCard
-from idcards.services import ensure_id_card_exists
-
-from idcards.models import IDCard
+from idcards.generator import render_many, RENDER_RENDERED, RENDER_EXISTS, RENDER_ERROR
 
 
 class Command(BaseCommand):
     help = "Self-heal and rebuild all missing ID cards"
 
-    def handle(self, *args, **kwargs):
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--workers",
+            type=int,
+            default=None,
+            help="Render processes (default: IDCARD_RENDER_WORKERS or CPU count)",
+        )
+
+    def handle(self, *args, **options):
         rebuilt = 0
         skipped = 0
+        failed = 0
 
-        for card in IDCard.objects.all():
-            url = ensure_id_card_exists(card)
-            if url:
+        card_ids = list(IDCard.objects.values_list("pk", flat=True))
+
+        for result in render_many(card_ids, workers=options["workers"]):
+            if result["status"] in (RENDER_RENDERED, RENDER_EXISTS):
                 rebuilt += 1
+            elif result["status"] == RENDER_ERROR:
+                failed += 1
+                self.stderr.write(f"FAILED card {result['id']}: {result['error']}")
             else:
                 skipped += 1
 
         self.stdout.write(self.style.SUCCESS(
-            f"Done. Rebuilt={rebuilt}, Skipped={skipped}"
+            f"Done. Rebuilt={rebuilt}, Skipped={skipped}, Failed={failed}"
         ))
-
-
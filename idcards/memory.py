@@ -0,0 +1,141 @@
+import threading
+import tracemalloc
+from contextlib import contextmanager
+
+from django.conf import settings
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+
+# Decoded passports above this are rejected before any pixels are read
+PASSPORT_MAX_PIXELS = 40_000_000
+
+
+# =====================================================
+# MEMORY-BOUNDED RENDERING (IDCARD_RENDER_LOW_MEMORY)
+# Only one passport decode / compose / encode runs at a
+# time per process, and each thread reuses one canvas
+# instead of allocating a fresh card per render. Network
+# waits (download, upload) stay outside the bound.
+# =====================================================
+_bound_lock = threading.Lock()
+_canvases = threading.local()
+
+
+def low_memory_enabled():
+    return bool(getattr(settings, "IDCARD_RENDER_LOW_MEMORY", False))
+
+
+def passport_max_pixels():
+    return int(getattr(settings, "IDCARD_PASSPORT_MAX_PIXELS", PASSPORT_MAX_PIXELS))
+
+
+@contextmanager
+def bounded_render():
+    """
+    Wrap pixel-heavy work. Serialized in low-memory mode,
+    a no-op otherwise.
+    """
+    if not low_memory_enabled():
+        yield
+        return
+
+    with _bound_lock:
+        yield
+
+
+def reusable_canvas(base):
+    """
+    This thread's card canvas, reset to `base`. The caller must
+    be done with the previous card before asking again.
+    """
+    canvas = getattr(_canvases, "card", None)
+
+    if canvas is None or canvas.size != base.size or canvas.mode != base.mode:
+        canvas = base.copy()
+        _canvases.card = canvas
+    else:
+        canvas.paste(base)
+
+    return canvas
+
+
+# =====================================================
+# PER-RENDER ALLOCATION ACCOUNTING (IDCARD_RENDER_MEMORY_TRACE)
+# python_peak: tracemalloc peak above the render's start
+#   (encoded bytes, buffers, NumPy arrays).
+# rss_high_water: process max RSS, which also covers Pillow
+#   pixel buffers that tracemalloc cannot see. rss_growth is
+#   how far this render pushed it up.
+# =====================================================
+_stats_lock = threading.Lock()
+_stats = {
+    "renders": 0,
+    "python_peak_last": 0,
+    "python_peak_max": 0,
+    "rss_high_water": 0,
+}
+
+
+def memory_trace_enabled():
+    return bool(getattr(settings, "IDCARD_RENDER_MEMORY_TRACE", False))
+
+
+def max_rss_bytes():
+    if resource is None:
+        return 0
+    # Linux reports kilobytes
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+
+
+def _record(label, python_peak, rss_before, rss_after):
+    with _stats_lock:
+        _stats["renders"] += 1
+        _stats["python_peak_last"] = python_peak
+        _stats["python_peak_max"] = max(_stats["python_peak_max"], python_peak)
+        _stats["rss_high_water"] = max(_stats["rss_high_water"], rss_after)
+
+    print(
+        "MEMORY: RENDER",
+        label,
+        f"python_peak={python_peak // 1024}KB",
+        f"rss_high_water={rss_after // 1024}KB",
+        f"rss_growth={(rss_after - rss_before) // 1024}KB",
+    )
+
+
+@contextmanager
+def render_memory(label=""):
+    """
+    Report the peak allocation of the wrapped render when
+    IDCARD_RENDER_MEMORY_TRACE is on. Concurrent renders in
+    one process share tracemalloc, so run with a single
+    thread (or low-memory mode) when sizing containers.
+    """
+    if not memory_trace_enabled():
+        yield
+        return
+
+    started = not tracemalloc.is_tracing()
+    if started:
+        tracemalloc.start()
+
+    tracemalloc.reset_peak()
+    baseline = tracemalloc.get_traced_memory()[0]
+    rss_before = max_rss_bytes()
+
+    try:
+        yield
+    finally:
+        peak = tracemalloc.get_traced_memory()[1] - baseline
+        if started:
+            tracemalloc.stop()
+        _record(label, max(0, peak), rss_before, max_rss_bytes())
+
+
+def render_memory_stats():
+    with _stats_lock:
+        return dict(_stats)
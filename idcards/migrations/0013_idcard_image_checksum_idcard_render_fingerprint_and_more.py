@@ -0,0 +1,33 @@
+# Generated by Django 4.2.16 on 2026-10-17 19:10
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('idcards', '0012_idcard_expires_at_alter_idcard_is_active_and_more'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='idcard',
+            name='image_checksum',
+            field=models.CharField(blank=True, default='', help_text='SHA-256 of the stored image bytes', max_length=64),
+        ),
+        migrations.AddField(
+            model_name='idcard',
+            name='render_fingerprint',
+            field=models.CharField(blank=True, default='', help_text='Hash of every input used to render the current image', max_length=64),
+        ),
+        migrations.AddField(
+            model_name='idcard',
+            name='render_inputs',
+            field=models.JSONField(blank=True, help_text='Inputs behind render_fingerprint (for stale-card reports)', null=True),
+        ),
+        migrations.AddField(
+            model_name='idcard',
+            name='rendered_at',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+    ]
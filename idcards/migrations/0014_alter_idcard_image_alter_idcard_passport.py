@@ -0,0 +1,24 @@
+# Generated by Django 4.2.16 on 2026-10-17 19:34
+
+from django.db import migrations
+import idcards.storage
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('idcards', '0013_idcard_image_checksum_idcard_render_fingerprint_and_more'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='idcard',
+            name='image',
+            field=idcards.storage.CardStorageField(blank=True, max_length=255, null=True, verbose_name='image'),
+        ),
+        migrations.AlterField(
+            model_name='idcard',
+            name='passport',
+            field=idcards.storage.CardStorageField(blank=True, max_length=255, null=True, verbose_name='image'),
+        ),
+    ]
@@ -0,0 +1,34 @@
+# Generated by Django 4.2.16 on 2026-10-17 19:35
+
+from django.db import migrations, models
+import django.db.models.deletion
+import django.utils.timezone
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('idcards', '0014_alter_idcard_image_alter_idcard_passport'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='FailoverImage',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('fingerprint', models.CharField(help_text='render_fingerprint of the inputs behind this image', max_length=64)),
+                ('render_inputs', models.JSONField(blank=True, null=True)),
+                ('content_type', models.CharField(max_length=50)),
+                ('data', models.BinaryField()),
+                ('checksum', models.CharField(max_length=64)),
+                ('rendered_at', models.DateTimeField(default=django.utils.timezone.now)),
+                ('attempts', models.PositiveIntegerField(default=0)),
+                ('last_error', models.CharField(blank=True, default='', max_length=255)),
+                ('card', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='failover_images', to='idcards.idcard')),
+            ],
+        ),
+        migrations.AddConstraint(
+            model_name='failoverimage',
+            constraint=models.UniqueConstraint(fields=('card', 'fingerprint'), name='unique_failover_image'),
+        ),
+    ]
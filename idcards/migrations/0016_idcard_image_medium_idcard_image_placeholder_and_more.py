@@ -0,0 +1,29 @@
+# Generated by Django 4.2.16 on 2026-10-17 19:41
+
+from django.db import migrations, models
+import idcards.storage
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('idcards', '0015_failoverimage_failoverimage_unique_failover_image'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='idcard',
+            name='image_medium',
+            field=idcards.storage.CardStorageField(blank=True, max_length=255, null=True, verbose_name='image (medium)'),
+        ),
+        migrations.AddField(
+            model_name='idcard',
+            name='image_placeholder',
+            field=models.TextField(blank=True, default='', help_text='Tiny blurred data: URI shown while the image loads'),
+        ),
+        migrations.AddField(
+            model_name='idcard',
+            name='image_thumb',
+            field=idcards.storage.CardStorageField(blank=True, max_length=255, null=True, verbose_name='image (thumbnail)'),
+        ),
+    ]
@@ -2,7 +2,7 @@ from django.db import models
 from django.utils import timezone
 from datetime import timedelta
 from students.models import Student
-from cloudinary.models import CloudinaryField
+from idcards.storage import CardStorageField
 import uuid
 import secrets
 
@@ -44,22 +44,43 @@ class IDCard(models.Model):
     created_at = models.DateTimeField(auto_now_add=True)
 
     # =================================================
-    # CLOUDINARY STORAGE
+    # CARD STORAGE (idcards.storage: Cloudinary or local)
     # =================================================
-    passport = CloudinaryField(
+    passport = CardStorageField(
         "image",
         folder="passports",
         blank=True,
         null=True,
     )
 
-    image = CloudinaryField(
+    image = CardStorageField(
         "image",
         folder="idcards",
         blank=True,
         null=True,
     )
 
+    # Built with every render (idcards.variants) for srcset
+    image_thumb = CardStorageField(
+        "image (thumbnail)",
+        folder="idcards/thumb",
+        blank=True,
+        null=True,
+    )
+
+    image_medium = CardStorageField(
+        "image (medium)",
+        folder="idcards/medium",
+        blank=True,
+        null=True,
+    )
+
+    image_placeholder = models.TextField(
+        blank=True,
+        default="",
+        help_text="Tiny blurred data: URI shown while the image loads",
+    )
+
     # =================================================
     # SECURITY  QR VERIFICATION
     # =================================================
@@ -84,6 +105,31 @@ class IDCard(models.Model):
         help_text="Card expiry date",
     )
 
+    # =================================================
+    # RENDER TRACKING (INCREMENTAL RE-ISSUE)
+    # =================================================
+    render_fingerprint = models.CharField(
+        max_length=64,
+        blank=True,
+        default="",
+        help_text="Hash of every input used to render the current image",
+    )
+
+    render_inputs = models.JSONField(
+        blank=True,
+        null=True,
+        help_text="Inputs behind render_fingerprint (for stale-card reports)",
+    )
+
+    image_checksum = models.CharField(
+        max_length=64,
+        blank=True,
+        default="",
+        help_text="SHA-256 of the stored image bytes",
+    )
+
+    rendered_at = models.DateTimeField(blank=True, null=True)
+
     # =================================================
     # PERFORMANCE INDEXES
     # =================================================
@@ -131,6 +177,34 @@ class IDCard(models.Model):
     def has_image(self):
         return bool(self.image and getattr(self.image, "public_id", None))
 
+    @property
+    def thumbnail_url(self):
+        """Smallest stored variant (full image for older cards)."""
+        for resource in (self.image_thumb, self.image_medium, self.image):
+            if resource and getattr(resource, "public_id", None):
+                return resource.url
+        return None
+
+    @property
+    def image_srcset(self):
+        """srcset over the stored variants and the full image."""
+        from idcards.variants import FULL_WIDTH, MEDIUM_WIDTH, THUMB_WIDTH
+
+        if not self.has_image:
+            return ""
+
+        candidates = [
+            (self.image_thumb, THUMB_WIDTH),
+            (self.image_medium, MEDIUM_WIDTH),
+            (self.image, FULL_WIDTH),
+        ]
+
+        return ", ".join(
+            f"{resource.url} {width}w"
+            for resource, width in candidates
+            if resource and getattr(resource, "public_id", None)
+        )
+
     @property
     def has_passport(self):
         return bool(self.passport and getattr(self.passport, "public_id", None))
@@ -178,3 +252,43 @@ class IDCard(models.Model):
     # =================================================
     def __str__(self):
         return f"{self.get_full_name()} ID Card"
+
+
+# =====================================================
+# FAILOVER IMAGE (DURABLE BLOB STORE)
+# A card rendered while the storage backend was down.
+# Served instead of a fresh render until the upload is
+# completed by `manage.py flush_failover_images`.
+# =====================================================
+class FailoverImage(models.Model):
+
+    card = models.ForeignKey(
+        IDCard,
+        on_delete=models.CASCADE,
+        related_name="failover_images",
+    )
+
+    fingerprint = models.CharField(
+        max_length=64,
+        help_text="render_fingerprint of the inputs behind this image",
+    )
+
+    render_inputs = models.JSONField(blank=True, null=True)
+
+    content_type = models.CharField(max_length=50)
+    data = models.BinaryField()
+    checksum = models.CharField(max_length=64)
+
+    rendered_at = models.DateTimeField(default=timezone.now)
+
+    # Upload retries by the flush job
+    attempts = models.PositiveIntegerField(default=0)
+    last_error = models.CharField(max_length=255, blank=True, default="")
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=["card", "fingerprint"], name="unique_failover_image"),
+        ]
+
+    def __str__(self):
+        return f"Failover image {self.card_id} ({self.fingerprint[:12]})"
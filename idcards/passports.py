@@ -0,0 +1,423 @@
+import hashlib
+import os
+import tempfile
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+from django.conf import settings
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+from idcards.storage import get_card_storage
+
+
+PASSPORT_TIMEOUT = 15
+
+# Matches DATA_UPLOAD_MAX_MEMORY_SIZE: nothing larger was accepted
+PASSPORT_MAX_BYTES = 20 * 1024 * 1024
+
+DOWNLOAD_CHUNK_SIZE = 64 * 1024
+
+
+# =====================================================
+# POOLED HTTP SESSION (ONE PER PROCESS)
+# Keeps TLS connections to Cloudinary alive between
+# renders instead of paying a handshake per passport.
+# =====================================================
+_session = None
+_session_lock = threading.Lock()
+
+
+def _prefetch_depth():
+    return max(1, int(getattr(settings, "IDCARD_PASSPORT_PREFETCH", 8)))
+
+
+def get_session():
+    global _session
+
+    if _session is not None:
+        return _session
+
+    with _session_lock:
+        if _session is None:
+            pool_size = _prefetch_depth() + 2
+            adapter = HTTPAdapter(
+                pool_connections=4,
+                pool_maxsize=pool_size,
+                max_retries=Retry(
+                    total=2,
+                    backoff_factor=0.3,
+                    status_forcelist=(502, 503, 504),
+                    allowed_methods=("GET",),
+                ),
+            )
+            session = requests.Session()
+            session.mount("https://", adapter)
+            session.mount("http://", adapter)
+            _session = session
+
+    return _session
+
+
+# =====================================================
+# SINGLE FETCH
+# =====================================================
+def fetch_passport_bytes(url):
+    """
+    Download passport bytes through the shared session.
+    The body is streamed and abandoned once it passes
+    IDCARD_PASSPORT_MAX_BYTES. Returns None on any failure
+    (never raises).
+    """
+    timeout = getattr(settings, "IDCARD_PASSPORT_TIMEOUT", PASSPORT_TIMEOUT)
+    max_bytes = int(getattr(settings, "IDCARD_PASSPORT_MAX_BYTES", PASSPORT_MAX_BYTES))
+
+    try:
+        with get_session().get(url, timeout=timeout, stream=True) as response:
+
+            if response.status_code != 200:
+                print("PASSPORT: DOWNLOAD FAILED", response.status_code, url)
+                return None
+
+            declared = int(response.headers.get("Content-Length") or 0)
+            if declared > max_bytes:
+                print("PASSPORT: TOO LARGE", declared, url)
+                return None
+
+            body = bytearray()
+            for chunk in response.iter_content(DOWNLOAD_CHUNK_SIZE):
+                body += chunk
+                if len(body) > max_bytes:
+                    print("PASSPORT: TOO LARGE", len(body), url)
+                    return None
+
+            return bytes(body)
+
+    except Exception as e:
+        print("PASSPORT: DOWNLOAD ERROR:", str(e))
+        return None
+
+
+# =====================================================
+# SERVER-SIDE DERIVATIVE
+# Cloudinary scales the passport to card size before it
+# leaves their CDN: a few KB instead of the original
+# upload. Scaled without cropping, like the local resize.
+# =====================================================
+def passport_derivative_url(resource, size):
+    """
+    URL of the passport scaled to `size`, or None when the value
+    is not a Cloudinary resource or derivatives are disabled.
+    """
+    if not size or not getattr(resource, "public_id", None):
+        return None
+
+    if not getattr(settings, "IDCARD_PASSPORT_DERIVATIVES", True):
+        return None
+
+    # Transformations are a Cloudinary feature
+    if not get_card_storage().remote:
+        return None
+
+    try:
+        return resource.build_url(
+            width=size[0],
+            height=size[1],
+            crop="scale",
+            format="jpg",
+            quality=95,
+            secure=True,
+        )
+    except Exception as e:
+        print("PASSPORT: DERIVATIVE URL FAILED:", str(e))
+        return None
+
+
+# =====================================================
+# LOCAL PASSPORT CACHE (CONTENT ADDRESSED, LRU)
+# Keyed by Cloudinary public_id + version, so a re-render
+# of an unchanged student never touches the network.
+# =====================================================
+def passport_cache_key(resource, size=None):
+    """
+    Stable cache key for a passport field value (or one of its
+    server-side derivatives). Falls back to the URL when the
+    value is not a Cloudinary resource.
+    """
+    public_id = getattr(resource, "public_id", None)
+
+    if public_id:
+        version = getattr(resource, "version", None) or ""
+        source = f"{public_id}@{version}"
+    else:
+        source = str(getattr(resource, "url", None) or resource)
+
+    if size:
+        source = f"{source}:{size[0]}x{size[1]}"
+
+    return hashlib.sha256(source.encode("utf-8")).hexdigest()
+
+
+class PassportCache:
+    """
+    Files live at <root>/<key[:2]>/<key>. A hit bumps the file
+    mtime; when the directory grows past `max_bytes` the least
+    recently used files are removed first. Composed passport
+    layers (idcards.layers) share the directory but are counted
+    separately (kind="layer").
+    """
+
+    def __init__(self, root, max_bytes):
+        self.root = str(root)
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self.layer_hits = 0
+        self.layer_misses = 0
+        self.evictions = 0
+        self._size = None
+        self._lock = threading.Lock()
+
+    @property
+    def enabled(self):
+        return self.max_bytes > 0
+
+    def _path(self, key):
+        return os.path.join(self.root, key[:2], key)
+
+    def _count(self, attr, amount=1):
+        with self._lock:
+            setattr(self, attr, getattr(self, attr) + amount)
+
+    def get(self, key, kind=""):
+        if not self.enabled:
+            return None
+
+        path = self._path(key)
+        prefix = f"{kind}_" if kind else ""
+
+        try:
+            with open(path, "rb") as f:
+                data = f.read()
+            os.utime(path)
+        except OSError:
+            self._count(prefix + "misses")
+            return None
+
+        self._count(prefix + "hits")
+        return data
+
+    def put(self, key, data):
+        if not self.enabled or not data or len(data) > self.max_bytes:
+            return
+
+        path = self._path(key)
+
+        try:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix=".tmp")
+            with os.fdopen(fd, "wb") as f:
+                f.write(data)
+            os.replace(tmp_path, path)
+        except OSError as e:
+            print("PASSPORT CACHE: WRITE FAILED:", str(e))
+            return
+
+        with self._lock:
+            if self._size is not None:
+                self._size += len(data)
+            over = self._size is None or self._size > self.max_bytes
+
+        if over:
+            self.evict()
+
+    def _entries(self):
+        entries = []
+        for dirpath, _, filenames in os.walk(self.root):
+            for name in filenames:
+                if name.endswith(".tmp"):
+                    continue
+                path = os.path.join(dirpath, name)
+                try:
+                    stat = os.stat(path)
+                except OSError:
+                    continue
+                entries.append((stat.st_mtime, stat.st_size, path))
+        return entries
+
+    def evict(self):
+        entries = self._entries()
+        total = sum(size for _, size, _ in entries)
+        removed = 0
+
+        if total > self.max_bytes:
+            for _, size, path in sorted(entries):
+                try:
+                    os.remove(path)
+                except OSError:
+                    continue
+                total -= size
+                removed += 1
+                if total <= self.max_bytes:
+                    break
+
+        with self._lock:
+            self._size = total
+            self.evictions += removed
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.misses
+            layer_lookups = self.layer_hits + self.layer_misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+                "layer_hits": self.layer_hits,
+                "layer_misses": self.layer_misses,
+                "layer_hit_rate": round(self.layer_hits / layer_lookups, 4) if layer_lookups else 0.0,
+                "bytes": self._size,
+                "max_bytes": self.max_bytes,
+            }
+
+
+_cache = None
+_cache_lock = threading.Lock()
+
+
+def get_passport_cache():
+    global _cache
+
+    if _cache is None:
+        with _cache_lock:
+            if _cache is None:
+                root = getattr(settings, "IDCARD_PASSPORT_CACHE_DIR", None) or os.path.join(
+                    tempfile.gettempdir(), "eksu_passport_cache"
+                )
+                max_bytes = int(getattr(settings, "IDCARD_PASSPORT_CACHE_MAX_BYTES", 0) or 0)
+                _cache = PassportCache(root, max_bytes)
+
+    return _cache
+
+
+def passport_cache_stats():
+    return get_passport_cache().stats()
+
+
+def get_passport_bytes(resource, size=None):
+    """
+    Passport bytes for a passport field value: local cache
+    first, the storage backend on a miss. With `size`, the server-side
+    derivative is tried before the original. Returns None on
+    failure.
+    """
+    cache = get_passport_cache()
+
+    derivative_url = passport_derivative_url(resource, size)
+    if derivative_url:
+        key = passport_cache_key(resource, size)
+
+        data = cache.get(key)
+        if data is None:
+            data = fetch_passport_bytes(derivative_url)
+            if data:
+                cache.put(key, data)
+
+        if data:
+            return data
+
+        print("PASSPORT: DERIVATIVE FAILED, USING ORIGINAL")
+
+    key = passport_cache_key(resource)
+
+    data = cache.get(key)
+    if data is not None:
+        return data
+
+    storage = get_card_storage()
+
+    if storage.remote:
+        try:
+            url = resource.url
+        except Exception as e:
+            print("PASSPORT: NO URL:", str(e))
+            return None
+
+        data = fetch_passport_bytes(url)
+    else:
+        max_bytes = int(getattr(settings, "IDCARD_PASSPORT_MAX_BYTES", PASSPORT_MAX_BYTES))
+        data = storage.read(resource, max_bytes)
+
+    if data:
+        cache.put(key, data)
+
+    return data
+
+
+# =====================================================
+# BOUNDED CONCURRENT PREFETCHER
+# Downloads the next N passports of a batch while the
+# current cards are being composed.
+# =====================================================
+class PassportPrefetcher:
+    """
+    Usage:
+
+        with PassportPrefetcher(passports) as prefetcher:
+            for passport in passports:
+                data = prefetcher.get(passport)
+
+    `passports` are passport field values. At most `depth` loads
+    are in flight at any time; cache hits complete immediately.
+    Passports not in the planned list are loaded synchronously.
+    With `size`, the card-sized derivatives are fetched.
+    """
+
+    def __init__(self, resources, depth=None, size=None):
+        self.depth = depth or _prefetch_depth()
+        self.size = size
+        planned = {}
+        for resource in resources:
+            if resource:
+                planned.setdefault(passport_cache_key(resource), resource)
+        self._pending = list(planned.items())
+        self._futures = {}
+        self._executor = ThreadPoolExecutor(
+            max_workers=self.depth,
+            thread_name_prefix="passport-prefetch",
+        )
+        self._fill()
+
+    def _fill(self):
+        while self._pending and len(self._futures) < self.depth:
+            key, resource = self._pending.pop(0)
+            self._futures[key] = self._executor.submit(get_passport_bytes, resource, self.size)
+
+    def get(self, resource):
+        key = passport_cache_key(resource)
+        future = self._futures.pop(key, None)
+
+        if future is None:
+            self._pending = [item for item in self._pending if item[0] != key]
+            data = get_passport_bytes(resource, self.size)
+        else:
+            data = future.result()
+
+        self._fill()
+        return data
+
+    def close(self):
+        self._pending = []
+        for future in self._futures.values():
+            future.cancel()
+        self._futures = {}
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+        return False
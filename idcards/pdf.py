@@ -0,0 +1,295 @@
+import os
+import threading
+from functools import lru_cache
+from io import BytesIO
+
+import numpy as np
+from PIL import Image
+from reportlab import rl_config
+from reportlab.lib.units import mm
+from reportlab.lib.utils import ImageReader
+from reportlab.pdfbase import pdfmetrics
+from reportlab.pdfbase.ttfonts import TTFont
+from reportlab.pdfgen import canvas as pdf_canvas
+
+from idcards.layout import get_layout
+from idcards.qr import qr_matrix
+from idcards.textfit import fit_text, font_metrics
+
+
+# ISO/IEC 7810 ID-1 (CR80)
+CR80_WIDTH = 85.6 * mm
+CR80_HEIGHT = 53.98 * mm
+
+FALLBACK_FONT = "Helvetica-Bold"
+
+# Binary image streams: ASCII85 would add 25% to the file and
+# dominate render time (this module is the only ReportLab user)
+rl_config.useA85 = 0
+
+# Watermark tracing grid (cells on the logo's long side) and
+# palette size; at 6% opacity finer detail is not visible
+WATERMARK_CELLS = 96
+WATERMARK_COLOURS = 6
+
+
+# =====================================================
+# VECTOR CARD (PRINT-READY PDF)
+# Walks the same compiled layout as the raster card, in
+# layout pixels scaled to CR80 points. Bars, text, QR
+# modules and the logo watermark are vector paths; only the
+# passport photo is embedded, as a JPEG. Text uses the layout's TTF fonts
+# (subset-embedded) and the same fit_text results, so
+# wrapping and shrinking match the PNG exactly.
+# =====================================================
+_fonts = {}
+_fonts_lock = threading.Lock()
+
+
+def _font_name(font):
+    """
+    ReportLab name for a Pillow FreeTypeFont, registering
+    its TTF file on first use.
+    """
+    path = getattr(font, "path", None)
+    if not path:
+        return FALLBACK_FONT
+
+    name = _fonts.get(path)
+    if name:
+        return name
+
+    with _fonts_lock:
+        if path not in _fonts:
+            name = "IDCard-" + os.path.splitext(os.path.basename(path))[0]
+            try:
+                pdfmetrics.registerFont(TTFont(name, path))
+            except Exception as e:
+                print("PDF: FONT REGISTER FAILED", path, str(e))
+                name = FALLBACK_FONT
+            _fonts[path] = name
+        return _fonts[path]
+
+
+def _runs(mask):
+    """
+    Horizontal runs of True cells as (rows, starts, ends) lists.
+    """
+    # Run starts and ends, both in row-major order so they pair up
+    edges = np.diff(np.pad(mask.view(np.int8), ((0, 0), (1, 1))), axis=1)
+    rows, starts = np.nonzero(edges == 1)
+    _, ends = np.nonzero(edges == -1)
+    return rows.tolist(), starts.tolist(), ends.tolist()
+
+
+@lru_cache(maxsize=8)
+def _watermark_layers(path):
+    """
+    The logo traced for vector drawing: (columns, rows, layers),
+    one layer of runs per quantized colour over opaque cells.
+    """
+    with Image.open(path) as logo:
+        logo = logo.convert("RGBA")
+        factor = WATERMARK_CELLS / max(logo.size)
+        logo = logo.resize(
+            (max(1, round(logo.width * factor)), max(1, round(logo.height * factor))),
+            Image.LANCZOS,
+        )
+
+    opaque = np.asarray(logo.getchannel("A")) >= 128
+    quantized = logo.convert("RGB").quantize(colors=WATERMARK_COLOURS)
+    palette = quantized.getpalette()
+    indices = np.asarray(quantized)
+
+    layers = []
+    for index in np.unique(indices[opaque]).tolist():
+        colour = tuple(palette[index * 3:index * 3 + 3])
+        layers.append((colour, _runs(opaque & (indices == index))))
+
+    return logo.width, logo.height, layers
+
+
+class _CardPainter:
+    """
+    Maps layout pixels (top-left origin) onto a card-sized
+    box at (x, y) points (bottom-left origin) of a canvas.
+    """
+
+    def __init__(self, c, layout, x, y, width):
+        self.c = c
+        self.layout = layout
+        self.scale = width / layout.size[0]
+        self.left = x
+        self.top = y + layout.size[1] * self.scale
+
+    def point(self, px, py):
+        return self.left + px * self.scale, self.top - py * self.scale
+
+    def fill(self, colour):
+        r, g, b = colour[:3]
+        self.c.setFillColorRGB(r / 255, g / 255, b / 255)
+
+    def rect(self, box, colour):
+        x0, y0, x1, y1 = box
+        x, y = self.point(x0, y1)
+        self.fill(colour)
+        self.c.rect(x, y, (x1 - x0) * self.scale, (y1 - y0) * self.scale, stroke=0, fill=1)
+
+    def text(self, xy, value, font, size, colour):
+        # Pillow draws from the ascender line; PDF from the baseline
+        if not value:
+            return
+        ascent = font_metrics(font.path, size)[0] if getattr(font, "path", None) else size
+        x, y = self.point(xy[0], xy[1] + ascent)
+        self.fill(colour)
+        self.c.setFont(_font_name(font), size * self.scale)
+        self.c.drawString(x, y, value)
+
+    def image(self, xy, size, image, mask=None):
+        x, y = self.point(xy[0], xy[1] + size[1])
+        self.c.drawImage(image, x, y, size[0] * self.scale, size[1] * self.scale, mask=mask)
+
+    def runs(self, xy, cell, runs, colour):
+        """
+        One filled path of horizontal cell runs.
+        """
+        cell_w, cell_h = cell
+        path = self.c.beginPath()
+
+        for row, start, end in zip(*runs):
+            x, y = self.point(xy[0] + start * cell_w, xy[1] + (row + 1) * cell_h)
+            path.rect(x, y, (end - start) * cell_w * self.scale, cell_h * self.scale)
+
+        self.fill(colour)
+        self.c.drawPath(path, stroke=0, fill=1)
+
+    def watermark(self, path, scale, opacity):
+        # Traced to vector runs: no second raster image in the PDF
+        if not os.path.exists(path):
+            return
+        w, h = self.layout.size
+        size = (int(w * scale), int(h * scale))
+        xy = ((w - size[0]) // 2, (h - size[1]) // 2)
+
+        self.c.saveState()
+        self.c.setFillAlpha(opacity)
+        try:
+            columns, rows, layers = _watermark_layers(path)
+            for colour, runs in layers:
+                self.runs(xy, (size[0] / columns, size[1] / rows), runs, colour)
+        except Exception as e:
+            print("PDF: WATERMARK FAILED", str(e))
+        self.c.restoreState()
+
+    def qr(self, xy, size, data):
+        """
+        One filled path of horizontal module runs per code.
+        """
+        matrix = qr_matrix(data)
+        module = size / matrix.shape[0]
+        self.runs(xy, (module, module), _runs(matrix), (0, 0, 0))
+
+
+def _passport_jpeg(passport):
+    # Handed to ReportLab as JPEG bytes, which it embeds as-is (DCT)
+    with BytesIO() as buffer:
+        passport.convert("RGB").save(buffer, format="JPEG", quality=92)
+        return buffer.getvalue()
+
+
+def draw_card(c, passport, details, verify_url, x=0, y=0, width=CR80_WIDTH, layout=None):
+    """
+    Draw one card onto ReportLab canvas `c` with its bottom-left
+    corner at (x, y) points, `width` points wide.
+    """
+    layout = layout or get_layout()
+    painter = _CardPainter(c, layout, x, y, width)
+
+    painter.rect((0, 0) + layout.size, layout.background)
+
+    for op in layout.static_ops:
+        kind = op[0]
+
+        if kind == "rect":
+            painter.rect(op[1], op[2])
+        elif kind == "text":
+            painter.text(op[1], op[2], op[3], op[3].size, op[4])
+        elif kind == "watermark":
+            painter.watermark(op[1], op[2], op[3])
+
+    for op in layout.field_ops:
+        kind = op[0]
+
+        if kind == "passport" and passport is not None:
+            painter.image(op[1], op[2], ImageReader(BytesIO(_passport_jpeg(passport))))
+
+        elif kind == "text":
+            _, (fx, fy), index, font, fill, fit = op
+            value = details[index]
+
+            if not fit:
+                painter.text((fx, fy), value, font, font.size, fill)
+                continue
+
+            size, lines = fit_text(value, *fit)
+            for dy, line in lines:
+                painter.text((fx, fy + dy), line, font, size, fill)
+
+        elif kind == "qr" and verify_url:
+            try:
+                painter.qr(op[1], op[2], verify_url)
+            except Exception as e:
+                print("PDF: QR FAILED", str(e))
+
+
+def build_card_pdf(passport, details, verify_url, title="EKSU Student ID Card"):
+    """
+    Single-page CR80 PDF of one card, built in memory.
+    Returns the PDF bytes.
+    """
+    with BytesIO() as buffer:
+        c = pdf_canvas.Canvas(buffer, pagesize=(CR80_WIDTH, CR80_HEIGHT), pageCompression=1)
+        c.setTitle(title)
+        c.setAuthor("Ekiti State University")
+
+        draw_card(c, passport, details, verify_url, width=CR80_WIDTH)
+
+        c.showPage()
+        c.save()
+        return buffer.getvalue()
+
+
+def render_card_pdf(idcard):
+    """
+    Print-ready PDF for `idcard`, or None when it cannot be
+    rendered (no student or no passport). Never raises.
+    """
+    from idcards.generator import (
+        build_verify_url,
+        get_approved_application,
+        get_student_details,
+        load_passport,
+    )
+
+    try:
+        student = getattr(idcard, "student", None)
+        if not student:
+            return None
+
+        passport = load_passport(student, application=get_approved_application(student))
+        if passport is None:
+            return None
+
+        details = get_student_details(student)
+
+        try:
+            verify_url = build_verify_url(idcard)
+        except Exception as e:
+            print("QR CRITICAL FAILURE:", str(e))
+            verify_url = None
+
+        return build_card_pdf(passport, details, verify_url, title=f"EKSU ID Card {details[1]}".strip())
+
+    except Exception as e:
+        print("PDF: RENDER FAILED:", str(e))
+        return None
@@ -1,9 +1,71 @@
 import qrcode
+import numpy as np
+from functools import lru_cache
 from io import BytesIO
+from PIL import Image
 from django.conf import settings
 import cloudinary.uploader
 
 
+QR_BORDER = 2
+QR_CACHE_SIZE = 4096
+
+
+# =====================================================
+# QR MODULE MATRIX (MEMOIZED PER VERIFY URL)
+# =====================================================
+@lru_cache(maxsize=QR_CACHE_SIZE)
+def qr_matrix(data):
+    """
+    Boolean module matrix (True = dark), quiet zone included.
+    Read-only: the same array is shared by every caller.
+    """
+    qr = qrcode.QRCode(
+        version=None,
+        border=QR_BORDER,
+        error_correction=qrcode.constants.ERROR_CORRECT_H,
+    )
+    qr.add_data(data)
+    qr.make(fit=True)
+
+    matrix = np.array(qr.get_matrix(), dtype=bool)
+    matrix.setflags(write=False)
+    return matrix
+
+
+def prime_qr_matrices(urls):
+    """
+    Encode each distinct URL into the qr_matrix cache ahead of a
+    batch; rasterizing stays with compose (render_qr), which
+    draws each code once at its layout size.
+    """
+    count = 0
+    for url in dict.fromkeys(u for u in urls if u):
+        qr_matrix(url)
+        count += 1
+    return count
+
+
+@lru_cache(maxsize=64)
+def _sample_index(modules, size):
+    # Pixel -> module lookup; nearest neighbour keeps module edges sharp
+    return np.arange(size) * modules // size
+
+
+# =====================================================
+# DIRECT-SIZE RASTERIZATION
+# =====================================================
+def render_qr(data, size):
+    """
+    Rasterize the QR for `data` straight to a size x size
+    greyscale image (no intermediate image, no resample).
+    """
+    matrix = qr_matrix(data)
+    index = _sample_index(matrix.shape[0], size)
+    pixels = np.where(matrix[np.ix_(index, index)], 0, 255).astype(np.uint8)
+    return Image.fromarray(pixels, "L")
+
+
 def generate_qr_code(id_card):
     """
     Generate QR code and upload to Cloudinary.
@@ -0,0 +1,25 @@
+"""
+Process pool entry points for idcards.generator.render_many
+and manage.py bench_render.
+
+No Django imports at module level: spawned workers unpickle these
+functions before Django has been configured.
+"""
+
+
+def init_worker():
+    import django
+
+    django.setup()
+
+
+def render_cards(card_ids, force=False):
+    from idcards.generator import render_chunk
+
+    return render_chunk(card_ids, force)
+
+
+def bench_cards(indices, storage_dir, encoder_name=None, passports=16, trace_memory=False):
+    from idcards.bench import bench_chunk
+
+    return bench_chunk(indices, storage_dir, encoder_name, passports, trace_memory)
@@ -0,0 +1,111 @@
+import multiprocessing
+import signal
+import threading
+import time
+
+from django.conf import settings
+
+
+SANDBOX_CPU_SECONDS = 10
+SANDBOX_MEMORY_MB = 512
+SANDBOX_TIMEOUT = 20
+
+
+class SandboxError(Exception):
+    """A sandboxed job failed, hit a limit or missed its deadline."""
+
+
+# =====================================================
+# SANDBOXED SUBPROCESS (IDCARD_RENDER_SANDBOX)
+# Untrusted image bytes are decoded in a short-lived
+# child with CPU-time and address-space rlimits and a
+# wall-clock deadline. Children fork from a forkserver
+# that has Pillow preloaded, so a job costs a fork, not
+# an interpreter start. A poisoned passport fails one
+# job with SandboxError instead of stalling a web worker.
+# =====================================================
+_context = None
+_context_lock = threading.Lock()
+
+
+def sandbox_enabled():
+    if not getattr(settings, "IDCARD_RENDER_SANDBOX", False):
+        return False
+    # forkserver and rlimits are POSIX only
+    return "forkserver" in multiprocessing.get_all_start_methods()
+
+
+def _get_context():
+    global _context
+
+    if _context is None:
+        with _context_lock:
+            if _context is None:
+                context = multiprocessing.get_context("forkserver")
+                context.set_forkserver_preload(["idcards.sandbox_worker"])
+                _context = context
+
+    return _context
+
+
+def _limits():
+    cpu_seconds = int(getattr(settings, "IDCARD_SANDBOX_CPU_SECONDS", SANDBOX_CPU_SECONDS))
+    memory_mb = int(getattr(settings, "IDCARD_SANDBOX_MEMORY_MB", SANDBOX_MEMORY_MB))
+    timeout = float(getattr(settings, "IDCARD_SANDBOX_TIMEOUT", SANDBOX_TIMEOUT))
+    return cpu_seconds, memory_mb * 1024 * 1024, timeout
+
+
+def _describe_exit(code):
+    if code is not None and code < 0:
+        try:
+            return f"killed by {signal.Signals(-code).name}"
+        except ValueError:
+            return f"killed by signal {-code}"
+    return f"exited with status {code}"
+
+
+def run_sandboxed(target, *args):
+    """
+    Run target(*args) in a sandboxed child and return its result.
+    `target` must be a module-level function importable without
+    Django (see idcards.sandbox_worker). Raises SandboxError.
+    """
+    from idcards import sandbox_worker
+
+    cpu_seconds, memory_bytes, timeout = _limits()
+    context = _get_context()
+    parent_conn, child_conn = context.Pipe(duplex=False)
+
+    process = context.Process(
+        target=sandbox_worker.sandbox_main,
+        args=(child_conn, cpu_seconds, memory_bytes, target, args),
+        daemon=True,
+    )
+
+    started = time.monotonic()
+
+    try:
+        process.start()
+        child_conn.close()
+
+        if not parent_conn.poll(timeout):
+            raise SandboxError(f"deadline of {timeout:g}s exceeded")
+
+        try:
+            status, value = parent_conn.recv()
+        except EOFError:
+            process.join(1)
+            raise SandboxError(_describe_exit(process.exitcode))
+
+    finally:
+        parent_conn.close()
+        if process.pid is not None:
+            if process.is_alive():
+                process.kill()
+            process.join(1)
+
+    if status != "ok":
+        raise SandboxError(value)
+
+    print(f"SANDBOX: {target.__name__} OK in {(time.monotonic() - started) * 1000:.0f}ms")
+    return value
@@ -0,0 +1,74 @@
+"""
+Child side of idcards.sandbox, plus the pixel work it runs.
+
+No Django imports: the forkserver preloads this module before
+(and without) Django being configured, and every sandboxed job is
+forked from it.
+"""
+import os
+import traceback
+from io import BytesIO
+
+from PIL import Image
+
+try:
+    import resource
+except ImportError:  # Windows: no sandbox (see sandbox.sandbox_enabled)
+    resource = None
+
+
+def decode_image(data, size, max_pixels):
+    """
+    Decode image bytes straight to an RGB image of `size`. JPEG
+    sources use draft mode; other formats shrink in integer
+    steps. Raises ValueError above `max_pixels`, before any
+    pixel data is read.
+    """
+    with Image.open(BytesIO(data)) as image:
+        if image.width * image.height > max_pixels:
+            raise ValueError(f"Image too large: {image.width}x{image.height}")
+
+        image.draft("RGB", size)
+
+        if image.mode == "RGB":
+            return image.resize(size, reducing_gap=3.0)
+
+        with image.convert("RGB") as rgb:
+            return rgb.resize(size, reducing_gap=3.0)
+
+
+def decode_image_pixels(data, size, max_pixels):
+    # Raw pixels pickle far smaller than an Image round trip
+    image = decode_image(data, size, max_pixels)
+    return image.mode, image.size, image.tobytes()
+
+
+def _apply_limits(cpu_seconds, memory_bytes):
+    if cpu_seconds:
+        resource.setrlimit(resource.RLIMIT_CPU, (cpu_seconds, cpu_seconds + 1))
+    if memory_bytes:
+        resource.setrlimit(resource.RLIMIT_AS, (memory_bytes, memory_bytes))
+    # A crashing decoder must not leave a core file behind
+    resource.setrlimit(resource.RLIMIT_CORE, (0, 0))
+
+
+def sandbox_main(conn, cpu_seconds, memory_bytes, target, args):
+    """
+    Entry point of one sandboxed job. Sends ("ok", result) or
+    ("error", message) and exits; being killed by a limit is
+    detected by the parent.
+    """
+    try:
+        _apply_limits(cpu_seconds, memory_bytes)
+        result = ("ok", target(*args))
+    except MemoryError:
+        result = ("error", "memory limit exceeded")
+    except BaseException as e:
+        traceback.print_exc()
+        result = ("error", f"{type(e).__name__}: {e}")
+
+    try:
+        conn.send(result)
+    finally:
+        conn.close()
+        os._exit(0)
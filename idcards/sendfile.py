@@ -0,0 +1,72 @@
+import mimetypes
+import os
+
+from django.conf import settings
+from django.http import FileResponse, HttpResponse
+
+
+SENDFILE_X_ACCEL = "x-accel-redirect"
+SENDFILE_X_SENDFILE = "x-sendfile"
+
+
+# =====================================================
+# FILE SERVING (SENDFILE / PROXY HAND-OFF)
+# Local files are never read into Python memory:
+#   ""                  FileResponse; the WSGI server's file
+#                       wrapper uses os.sendfile (gunicorn)
+#   "x-accel-redirect"  nginx serves the file from its
+#                       internal location IDCARD_SENDFILE_PREFIX
+#   "x-sendfile"        Apache mod_xsendfile / lighttpd
+# With a proxy hand-off the worker returns an empty body
+# at once. Only files under IDCARD_SENDFILE_ROOT are
+# handed off; anything else falls back to FileResponse.
+# =====================================================
+def sendfile_mode():
+    return str(getattr(settings, "IDCARD_SENDFILE", "") or "").lower()
+
+
+def sendfile_root():
+    return os.path.realpath(
+        getattr(settings, "IDCARD_SENDFILE_ROOT", "")
+        or getattr(settings, "IDCARD_STORAGE_ROOT", "")
+        or os.path.join(settings.BASE_DIR, "card_storage")
+    )
+
+
+def _relative_to_root(path):
+    root = sendfile_root()
+    real = os.path.realpath(path)
+    if os.path.commonpath([root, real]) != root:
+        return None
+    return os.path.relpath(real, root).replace(os.sep, "/")
+
+
+def file_response(path, content_type=None, filename=None, as_attachment=False):
+    """
+    Response serving the file at `path` without buffering it.
+    Raises FileNotFoundError when it does not exist.
+    """
+    if not os.path.isfile(path):
+        raise FileNotFoundError(path)
+
+    content_type = content_type or mimetypes.guess_type(path)[0] or "application/octet-stream"
+    filename = filename or os.path.basename(path)
+    mode = sendfile_mode()
+    relative = _relative_to_root(path) if mode else None
+
+    if relative is None:
+        return FileResponse(open(path, "rb"), content_type=content_type, as_attachment=as_attachment, filename=filename)
+
+    response = HttpResponse(content_type=content_type)
+
+    if mode == SENDFILE_X_ACCEL:
+        prefix = getattr(settings, "IDCARD_SENDFILE_PREFIX", "/protected/").rstrip("/")
+        response["X-Accel-Redirect"] = f"{prefix}/{relative}"
+    elif mode == SENDFILE_X_SENDFILE:
+        response["X-Sendfile"] = os.path.realpath(path)
+    else:
+        raise ValueError(f"Unknown IDCARD_SENDFILE: {mode!r}")
+
+    disposition = "attachment" if as_attachment else "inline"
+    response["Content-Disposition"] = f'{disposition}; filename="{filename}"'
+    return response
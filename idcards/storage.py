@@ -0,0 +1,278 @@
+import mimetypes
+import os
+import threading
+import time
+import uuid
+
+from cloudinary import CloudinaryResource
+from cloudinary.models import CloudinaryField
+from django.conf import settings
+from django.core.files.storage import FileSystemStorage
+from django.core.files.uploadedfile import UploadedFile
+
+
+STORAGE_CHUNK_SIZE = 64 * 1024
+
+
+# =====================================================
+# STORED RESOURCE
+# Field values keep Cloudinary's neutral format
+# ("image/upload/v<version>/<public_id>.<format>") for
+# every backend, so switching backends needs no data
+# migration. Only the URL depends on the backend.
+# =====================================================
+class StoredResource(CloudinaryResource):
+
+    @property
+    def url(self):
+        return get_card_storage().url(self)
+
+    @property
+    def key(self):
+        """Backend object name: public_id plus extension."""
+        return f"{self.public_id}.{self.format}" if self.format else self.public_id
+
+
+def stored_resource(resource):
+    """
+    StoredResource for any CloudinaryResource (or None).
+    """
+    if resource is None or isinstance(resource, StoredResource):
+        return resource
+
+    return StoredResource(
+        public_id=resource.public_id,
+        format=resource.format,
+        version=resource.version,
+        metadata=resource.metadata,
+        type=resource.type,
+        resource_type=resource.resource_type,
+    )
+
+
+# =====================================================
+# BACKENDS
+# upload(file, folder, resource_type, **options) -> StoredResource
+# url / exists / delete / open(resource)
+# `options` are Cloudinary upload options (type, tags,
+# transformation, ...); backends that cannot honour them
+# ignore them. `open` returns a binary file object; the
+# caller closes it.
+# =====================================================
+class CardStorage:
+    name = ""
+
+    # True when objects live behind HTTP (fetch by URL)
+    remote = False
+
+    def upload(self, file, folder="", resource_type="image", **options):
+        raise NotImplementedError
+
+    def url(self, resource):
+        raise NotImplementedError
+
+    def exists(self, resource):
+        raise NotImplementedError
+
+    def delete(self, resource):
+        raise NotImplementedError
+
+    def open(self, resource):
+        raise NotImplementedError
+
+    def read(self, resource, max_bytes=None):
+        """
+        Whole object as bytes, or None when it is missing, larger
+        than `max_bytes` or unreadable. Never raises.
+        """
+        try:
+            with self.open(resource) as stream:
+                body = bytearray()
+                while True:
+                    chunk = stream.read(STORAGE_CHUNK_SIZE)
+                    if not chunk:
+                        return bytes(body)
+                    body += chunk
+                    if max_bytes and len(body) > max_bytes:
+                        print("STORAGE: TOO LARGE", len(body), getattr(resource, "public_id", resource))
+                        return None
+        except Exception as e:
+            print(f"STORAGE ({self.name}): READ FAILED:", str(e))
+            return None
+
+
+class CloudinaryCardStorage(CardStorage):
+    name = "cloudinary"
+    remote = True
+
+    def upload(self, file, folder="", resource_type="image", **options):
+        from cloudinary import uploader
+
+        options = {"type": "upload", **options, "resource_type": resource_type}
+        if folder:
+            options["folder"] = folder
+
+        return stored_resource(uploader.upload_resource(file, **options))
+
+    def url(self, resource):
+        # CloudinaryResource.url, bypassing StoredResource.url
+        return CloudinaryResource.url.fget(resource)
+
+    def exists(self, resource):
+        from cloudinary import api
+        from cloudinary.exceptions import NotFound
+
+        try:
+            api.resource(resource.public_id, type=resource.type, resource_type=resource.resource_type)
+            return True
+        except NotFound:
+            return False
+
+    def delete(self, resource):
+        from cloudinary import uploader
+
+        uploader.destroy(resource.public_id, type=resource.type, resource_type=resource.resource_type)
+
+    def open(self, resource):
+        from idcards.passports import get_session
+
+        timeout = getattr(settings, "IDCARD_PASSPORT_TIMEOUT", 15)
+        response = get_session().get(self.url(resource), timeout=timeout, stream=True)
+        if response.status_code != 200:
+            response.close()
+            raise FileNotFoundError(f"{response.status_code} {resource.public_id}")
+
+        response.raw.decode_content = True
+        return response.raw
+
+
+class LocalCardStorage(CardStorage):
+    """
+    Files under IDCARD_STORAGE_ROOT, served from IDCARD_STORAGE_URL
+    (see idcards.views.serve_stored). For development, CI, benchmarks
+    and single-node deployments.
+    """
+
+    name = "local"
+
+    def __init__(self, root, base_url):
+        self.files = FileSystemStorage(location=root, base_url=base_url)
+
+    def upload(self, file, folder="", resource_type="image", **options):
+        # Plain file copy: Cloudinary upload options do not apply
+        name = getattr(file, "name", "") or ""
+        extension = os.path.splitext(name)[1].lstrip(".").lower()
+
+        if not extension:
+            guessed = mimetypes.guess_extension(getattr(file, "content_type", "") or "") or ""
+            extension = guessed.lstrip(".") or "bin"
+
+        public_id = "/".join(filter(None, [folder.strip("/"), uuid.uuid4().hex]))
+        saved = self.files.save(f"{public_id}.{extension}", file)
+        public_id, extension = os.path.splitext(saved)
+
+        return StoredResource(
+            public_id=public_id.replace(os.sep, "/"),
+            format=extension.lstrip("."),
+            version=str(int(time.time())),
+            type="upload",
+            resource_type=resource_type,
+        )
+
+    def url(self, resource):
+        return self.files.url(stored_resource(resource).key)
+
+    def exists(self, resource):
+        return self.files.exists(stored_resource(resource).key)
+
+    def delete(self, resource):
+        self.files.delete(stored_resource(resource).key)
+
+    def open(self, resource):
+        return self.files.open(stored_resource(resource).key, "rb")
+
+    def path(self, resource):
+        return self.files.path(stored_resource(resource).key)
+
+
+STORAGE_BACKENDS = {
+    "cloudinary": lambda: CloudinaryCardStorage(),
+    "local": lambda: LocalCardStorage(
+        getattr(settings, "IDCARD_STORAGE_ROOT", None) or os.path.join(settings.BASE_DIR, "card_storage"),
+        getattr(settings, "IDCARD_STORAGE_URL", "/idcards/media/"),
+    ),
+}
+
+_storages = {}
+_storages_lock = threading.Lock()
+
+
+def storage_settings():
+    return (
+        str(getattr(settings, "IDCARD_STORAGE_BACKEND", "cloudinary") or "cloudinary").lower(),
+        str(getattr(settings, "IDCARD_STORAGE_ROOT", "") or ""),
+        str(getattr(settings, "IDCARD_STORAGE_URL", "") or ""),
+    )
+
+
+def get_card_storage():
+    """
+    The backend selected by IDCARD_STORAGE_BACKEND ("cloudinary"
+    or "local"), one instance per process and configuration.
+    """
+    key = storage_settings()
+
+    storage = _storages.get(key)
+    if storage is not None:
+        return storage
+
+    if key[0] not in STORAGE_BACKENDS:
+        raise ValueError(f"Unknown IDCARD_STORAGE_BACKEND: {key[0]!r}")
+
+    with _storages_lock:
+        if key not in _storages:
+            _storages[key] = STORAGE_BACKENDS[key[0]]()
+        return _storages[key]
+
+
+# =====================================================
+# MODEL FIELD
+# CloudinaryField whose uploads go through the selected
+# backend and whose values resolve URLs through it.
+# Same column, same stored format, same admin widget.
+# =====================================================
+class CardStorageField(CloudinaryField):
+    description = "An image stored in the configured card storage backend"
+
+    def parse_cloudinary_resource(self, value):
+        return stored_resource(super().parse_cloudinary_resource(value))
+
+    def pre_save(self, model_instance, add):
+        value = getattr(model_instance, self.attname)
+
+        if not isinstance(value, UploadedFile):
+            return value
+
+        if hasattr(value, "seekable") and value.seekable():
+            value.seek(0)
+
+        # Every upload option given to the field, as CloudinaryField does
+        options = {key: val(model_instance) if callable(val) else val for key, val in self.options.items()}
+        folder = options.pop("folder", "") or ""
+
+        resource = get_card_storage().upload(
+            value,
+            folder=folder,
+            resource_type=self.resource_type,
+            type=self.type,
+            **options,
+        )
+        setattr(model_instance, self.attname, resource)
+
+        metadata = resource.metadata or {}
+        if self.width_field:
+            setattr(model_instance, self.width_field, metadata.get("width"))
+        if self.height_field:
+            setattr(model_instance, self.height_field, metadata.get("height"))
+
+        return self.get_prep_value(resource)
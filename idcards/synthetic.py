@@ -0,0 +1,66 @@
+import numpy as np
+from PIL import Image, ImageDraw, ImageFilter
+
+
+# =====================================================
+# SYNTHETIC RENDER INPUTS (BENCHMARKS ONLY)
+# Photo-like passports so encoder and render numbers
+# resemble real cards; no network, no database.
+# =====================================================
+SAMPLE_NAMES = [
+    ("ADEBAYO", "OLUWASEUN", "BABATUNDE"),
+    ("CHIAMAKA", "", "OKONKWO"),
+    ("IBRAHIM", "ABUBAKAR", "MUHAMMAD"),
+    ("OLUWADAMILOLA", "TEMITOPE", "ADEYEMI-OGUNLEYE"),
+]
+
+SAMPLE_DEPARTMENTS = [
+    "COMPUTER SCIENCE",
+    "PUBLIC ADMINISTRATION",
+    "INDUSTRIAL CHEMISTRY",
+    "GUIDANCE AND COUNSELLING",
+]
+
+
+def synthetic_passport(seed=0, size=(600, 800)):
+    """
+    Smooth background, head-and-shoulders shapes and sensor noise.
+    """
+    rng = np.random.default_rng(seed)
+    width, height = size
+
+    y = np.linspace(0, 1, height)[:, None, None]
+    x = np.linspace(0, 1, width)[None, :, None]
+    tint = rng.uniform(120, 220, size=3)
+    background = tint * (0.75 + 0.25 * y) * (0.9 + 0.1 * x)
+
+    image = Image.fromarray(np.clip(background, 0, 255).astype(np.uint8), "RGB")
+    draw = ImageDraw.Draw(image)
+
+    skin = tuple(int(v) for v in rng.uniform(90, 200, size=3))
+    cloth = tuple(int(v) for v in rng.uniform(20, 120, size=3))
+    draw.ellipse((width * 0.3, height * 0.15, width * 0.7, height * 0.6), fill=skin)
+    draw.rectangle((width * 0.15, height * 0.65, width * 0.85, height), fill=cloth)
+    image = image.filter(ImageFilter.GaussianBlur(3))
+
+    noise = rng.normal(0, 6, size=(height, width, 3))
+    pixels = np.clip(np.asarray(image, dtype=np.float32) + noise, 0, 255)
+    return Image.fromarray(pixels.astype(np.uint8), "RGB")
+
+
+def synthetic_details(index=0):
+    """
+    Same shape as generator.get_student_details().
+    """
+    first, middle, last = SAMPLE_NAMES[index % len(SAMPLE_NAMES)]
+    full_name = " ".join(filter(None, [first, middle, last]))
+    matric = f"EKSU/2023/{index:04d}"
+    department = SAMPLE_DEPARTMENTS[index % len(SAMPLE_DEPARTMENTS)]
+    level = str(100 * (1 + index % 5))
+    phone = f"080{index:08d}"
+    return full_name, matric, department, level, phone
+
+
+def synthetic_verify_url(index=0):
+    token = f"{index:043d}"
+    return f"https://eksu-id.example/verify/00000000-0000-4000-8000-{index:012d}/{token}/"
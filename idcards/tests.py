@@ -0,0 +1,80 @@
+import os
+from unittest import mock
+
+from django.http import HttpResponse
+from django.test import SimpleTestCase, TestCase, override_settings
+from PIL import Image
+
+from accounts.models import User
+from applications.models import IDApplication
+from idcards.encoders import get_encoder
+from idcards.layout import DEFAULT_LAYOUT_SPEC
+from idcards.management.commands.golden_cards import (
+    GOLDEN_CASES,
+    GOLDEN_DIR,
+    GOLDEN_MAX_MISMATCH,
+    GOLDEN_TOLERANCE,
+    pixel_diff,
+    render_case,
+)
+from idcards.models import IDCard
+from students.models import Student
+
+
+@override_settings(SECURE_SSL_REDIRECT=False)
+@mock.patch("idcards.views.ensure_id_card_exists", lambda id_card: None)
+@mock.patch("idcards.views._build_image_response", lambda id_card, download=False, spooled=None: HttpResponse(b"card"))
+class CardImageValidatorTests(TestCase):
+
+    def setUp(self):
+        user = User.objects.create(username="EKSU/2023/001")
+        self.student = Student.objects.create(
+            user=user,
+            matric_number="EKSU/2023/001",
+            first_name="ADE",
+            last_name="BOLA",
+            department="PUBLIC ADMINISTRATION",
+            level="200",
+        )
+        IDApplication.objects.create(
+            student=self.student,
+            status=IDApplication.STATUS_APPROVED,
+            passport="image/upload/v1/id_applications/passports/p1.jpg",
+        )
+        # No stored image: served from failover / in-memory renders
+        self.card, _ = IDCard.objects.get_or_create(student=self.student)
+        self.url = f"/idcards/stream/{self.card.uid}/download/"
+
+    def test_unchanged_card_is_not_modified(self):
+        etag = self.client.get(self.url)["ETag"]
+
+        response = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+
+    def test_student_change_invalidates_failover_card(self):
+        etag = self.client.get(self.url)["ETag"]
+
+        self.student.last_name = "ADEWALE"
+        self.student.save()
+
+        response = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response["ETag"], etag)
+
+
+# Same check as `manage.py golden_cards`, so CI catches rendering
+# regressions; refresh references with `golden_cards --update`.
+@override_settings(IDCARD_LAYOUT_SPEC=DEFAULT_LAYOUT_SPEC)
+class GoldenCardTests(SimpleTestCase):
+
+    def test_golden_cards_match_references(self):
+        encoder = get_encoder("png")
+
+        for case in GOLDEN_CASES:
+            with self.subTest(case=case["name"]):
+                actual, _ = render_case(case, encoder)
+
+                with Image.open(os.path.join(GOLDEN_DIR, f"{case['name']}.png")) as expected:
+                    diff = pixel_diff(actual, expected, GOLDEN_TOLERANCE)
+
+                self.assertLessEqual(diff["mismatch_ratio"], GOLDEN_MAX_MISMATCH)
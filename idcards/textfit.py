@@ -0,0 +1,114 @@
+from functools import lru_cache
+
+from PIL import ImageFont
+
+
+# =====================================================
+# TEXT FITTING (MEMOIZED)
+# Long names and departments shrink to fit their box,
+# then wrap to two lines. Every measurement and every
+# fit result is cached, so a batch of thousands of
+# cards measures each distinct string only once.
+# =====================================================
+ELLIPSIS = "..."
+
+
+@lru_cache(maxsize=128)
+def get_font(path, size):
+    try:
+        return ImageFont.truetype(path, size)
+    except Exception:
+        return ImageFont.load_default()
+
+
+@lru_cache(maxsize=16384)
+def text_width(text, path, size):
+    return get_font(path, size).getlength(text)
+
+
+@lru_cache(maxsize=128)
+def font_metrics(path, size):
+    ascent, descent = get_font(path, size).getmetrics()
+    return ascent, descent
+
+
+def _fits_line(text, path, size, width):
+    return text_width(text, path, size) <= width
+
+
+def _best_split(words, path, size):
+    """
+    Split words into two lines minimising the wider line.
+    """
+    best = None
+    for i in range(1, len(words)):
+        first, second = " ".join(words[:i]), " ".join(words[i:])
+        widest = max(text_width(first, path, size), text_width(second, path, size))
+        if best is None or widest < best[0]:
+            best = (widest, first, second)
+    return best
+
+
+def _truncate(text, path, size, width):
+    if _fits_line(text, path, size, width):
+        return text
+    while text and not _fits_line(text + ELLIPSIS, path, size, width):
+        text = text[:-1]
+    return text.rstrip() + ELLIPSIS
+
+
+@lru_cache(maxsize=8192)
+def fit_text(text, path, max_size, min_size, width, height, baseline):
+    """
+    Fit `text` into a width x height box whose first baseline
+    sits `baseline` px below the top (so values line up with
+    their labels).
+
+    Returns (size, ((dy, line), ...)) where dy is each line's
+    top offset from the box top.
+    """
+
+    def placed(size, lines):
+        ascent, descent = font_metrics(path, size)
+        top = baseline - ascent
+        return size, tuple((top + i * (ascent + descent), line) for i, line in enumerate(lines))
+
+    def block_height(size, count):
+        ascent, descent = font_metrics(path, size)
+        return baseline - ascent + count * (ascent + descent)
+
+    # 1. Largest single-line size (width shrinks monotonically)
+    low, high, best = min_size, max_size, None
+    while low <= high:
+        size = (low + high) // 2
+        if _fits_line(text, path, size, width):
+            best, low = size, size + 1
+        else:
+            high = size - 1
+
+    if best is not None:
+        return placed(best, [text])
+
+    # 2. Two lines, largest size whose block fits the box
+    words = text.split()
+    if len(words) > 1:
+        for size in range(max_size, min_size - 1, -1):
+            if block_height(size, 2) > height:
+                continue
+            widest, first, second = _best_split(words, path, size)
+            if widest <= width:
+                return placed(size, [first, second])
+
+    # 3. Smallest size, truncated
+    if len(words) > 1 and block_height(min_size, 2) <= height:
+        _, first, second = _best_split(words, path, min_size)
+        return placed(min_size, [_truncate(first, path, min_size, width), _truncate(second, path, min_size, width)])
+
+    return placed(min_size, [_truncate(text, path, min_size, width)])
+
+
+def fit_cache_stats():
+    return {
+        "fit": fit_text.cache_info()._asdict(),
+        "width": text_width.cache_info()._asdict(),
+    }
@@ -0,0 +1,159 @@
+import bisect
+import logging
+import threading
+import time
+from contextlib import contextmanager
+
+
+logger = logging.getLogger("idcards.render")
+
+STAGES = ("passport", "qr", "compose", "encode", "variants", "upload")
+
+# Histogram bucket upper bounds (ms); the last bucket is open ended
+BUCKETS_MS = (1, 2, 5, 10, 20, 50, 100, 200, 500, 1000, 2000, 5000, 10000, 30000)
+
+
+# =====================================================
+# PER-RENDER STAGE TIMER
+# Stages are exclusive: a stage nested inside another
+# (qr inside compose) is subtracted from its parent, so
+# the stage times add up to the time spent in stages.
+# =====================================================
+class RenderTimer:
+
+    def __init__(self, label=""):
+        self.label = str(label)
+        self.status = "failed"
+        self.stages = {}
+        self._stack = []
+        self._started = time.perf_counter()
+
+    @contextmanager
+    def stage(self, name):
+        frame = [time.perf_counter(), 0.0]
+        self._stack.append(frame)
+        try:
+            yield
+        finally:
+            self._stack.pop()
+            elapsed = time.perf_counter() - frame[0]
+            self.stages[name] = self.stages.get(name, 0.0) + (elapsed - frame[1]) * 1000
+            if self._stack:
+                self._stack[-1][1] += elapsed
+
+    def record(self):
+        return {
+            "card": self.label,
+            "status": self.status,
+            "total_ms": round((time.perf_counter() - self._started) * 1000, 2),
+            "stages": {name: round(ms, 2) for name, ms in self.stages.items()},
+        }
+
+    def finish(self):
+        """
+        Emit the timing record and add it to the histogram.
+        Renders that never reached a stage are not recorded.
+        """
+        if not self.stages:
+            return None
+
+        record = self.record()
+        HISTOGRAM.add(record)
+
+        logger.info(
+            "render card=%s status=%s total=%.1fms %s",
+            record["card"],
+            record["status"],
+            record["total_ms"],
+            " ".join(f"{name}={ms:.1f}ms" for name, ms in record["stages"].items()),
+            extra={"render_timing": record},
+        )
+        return record
+
+
+class _NullTimer:
+
+    @contextmanager
+    def stage(self, name):
+        yield
+
+
+NULL_TIMER = _NullTimer()
+
+
+# =====================================================
+# IN-PROCESS HISTOGRAM
+# Fixed buckets per stage (plus "total"), cheap enough
+# to keep for the life of the process.
+# =====================================================
+class TimingHistogram:
+
+    def __init__(self, bounds=BUCKETS_MS):
+        self.bounds = tuple(bounds)
+        self._series = {}
+        self._lock = threading.Lock()
+
+    def _observe(self, name, ms):
+        series = self._series.get(name)
+        if series is None:
+            series = self._series[name] = {
+                "count": 0,
+                "sum": 0.0,
+                "max": 0.0,
+                "buckets": [0] * (len(self.bounds) + 1),
+            }
+
+        series["count"] += 1
+        series["sum"] += ms
+        series["max"] = max(series["max"], ms)
+        series["buckets"][bisect.bisect_left(self.bounds, ms)] += 1
+
+    def add(self, record):
+        with self._lock:
+            self._observe("total", record["total_ms"])
+            for name, ms in record["stages"].items():
+                self._observe(name, ms)
+
+    def _quantile(self, series, q):
+        target = q * series["count"]
+        seen = 0
+        for bound, count in zip(self.bounds, series["buckets"]):
+            seen += count
+            if seen >= target:
+                return bound
+        return series["max"]
+
+    def snapshot(self):
+        """
+        Per-series count, mean, max and bucket-resolution
+        p50/p95/p99 (upper bucket bounds, in ms).
+        """
+        with self._lock:
+            result = {}
+            for name, series in self._series.items():
+                count = series["count"]
+                result[name] = {
+                    "count": count,
+                    "mean_ms": round(series["sum"] / count, 2),
+                    "max_ms": round(series["max"], 2),
+                    "p50_ms": self._quantile(series, 0.50),
+                    "p95_ms": self._quantile(series, 0.95),
+                    "p99_ms": self._quantile(series, 0.99),
+                    "buckets": dict(zip([*map(str, self.bounds), "inf"], series["buckets"])),
+                }
+            return result
+
+    def reset(self):
+        with self._lock:
+            self._series = {}
+
+
+HISTOGRAM = TimingHistogram()
+
+
+def render_timing_stats():
+    return HISTOGRAM.snapshot()
+
+
+def reset_render_timings():
+    HISTOGRAM.reset()
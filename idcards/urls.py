@@ -1,5 +1,5 @@
 from django.urls import path
-from .views import verify_id, download_id, view_id_card, download_id_stream
+from .views import verify_id, download_id, view_id_card, download_id_stream, download_id_pdf, serve_stored
 
 app_name = "idcards"
 
@@ -20,5 +20,9 @@ urlpatterns = [
 
     path("stream/<uuid:uid>/", view_id_card, name="view_id_stream"),
     path("stream/<uuid:uid>/download/", download_id_stream, name="download_id_stream"),
+    path("stream/<uuid:uid>/pdf/", download_id_pdf, name="download_id_pdf"),
+
+    # Local card storage backend (idcards.storage)
+    path("media/<path:name>", serve_stored, name="serve_stored"),
 ]
 
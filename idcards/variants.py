@@ -0,0 +1,87 @@
+import base64
+from io import BytesIO
+
+from django.core.files.uploadedfile import SimpleUploadedFile
+from PIL import Image, ImageFilter
+
+
+# Widths for srcset; heights follow the card's aspect
+FULL_WIDTH = 1010
+THUMB_WIDTH = 202
+MEDIUM_WIDTH = 505
+PLACEHOLDER_WIDTH = 24
+
+UPLOAD_FIELDS = ("image_thumb", "image_medium")
+
+
+# =====================================================
+# CARD IMAGE VARIANTS (BUILT WITH EVERY RENDER)
+# The full card is 1010x640 but pages show it at 60-320px.
+#   image_thumb        admin lists, small screens
+#   image_medium       dashboard / verify page (1x)
+#   image_placeholder  blurred data: URI inlined in the
+#                      page while the real image loads
+# The full image stays the 2x source in srcset.
+# =====================================================
+def _scaled(image, width):
+    # Exact integer factors (1010 -> 505): box reduce, ~10x cheaper
+    if image.width % width == 0 and image.height % (image.width // width) == 0:
+        return image.reduce(image.width // width)
+
+    height = max(1, round(image.height * width / image.width))
+    return image.resize((width, height), Image.LANCZOS)
+
+
+def _jpeg(image, quality):
+    with BytesIO() as buffer:
+        image.save(buffer, format="JPEG", quality=quality, optimize=True)
+        return buffer.getvalue()
+
+
+def _flatten(image):
+    if image.mode in ("RGBA", "LA", "P"):
+        rgba = image.convert("RGBA")
+        flat = Image.new("RGB", rgba.size, (255, 255, 255))
+        flat.paste(rgba, mask=rgba.getchannel("A"))
+        return flat
+    if image.mode != "RGB":
+        return image.convert("RGB")
+    return image
+
+
+def render_card_variants(card):
+    """
+    Return (thumb_jpeg, medium_jpeg, placeholder_data_uri) for a
+    composed card image. The card itself is left untouched.
+    """
+    medium = _flatten(_scaled(card, MEDIUM_WIDTH))
+    thumb = _scaled(medium, THUMB_WIDTH)
+
+    tiny = _scaled(thumb, PLACEHOLDER_WIDTH).filter(ImageFilter.GaussianBlur(1))
+    placeholder = "data:image/jpeg;base64," + base64.b64encode(_jpeg(tiny, 40)).decode("ascii")
+
+    return _jpeg(thumb, 80), _jpeg(medium, 82), placeholder
+
+
+def card_variant_values(card, name="card"):
+    """
+    Field values for IDCard.image_thumb / image_medium /
+    image_placeholder from a PIL image or encoded bytes. Cleared
+    values when it cannot be read, so a new card image never
+    keeps variants of the old one.
+    """
+    try:
+        if isinstance(card, (bytes, bytearray)):
+            with Image.open(BytesIO(card)) as image:
+                thumb, medium, placeholder = render_card_variants(image)
+        else:
+            thumb, medium, placeholder = render_card_variants(card)
+    except Exception as e:
+        print("CARD VARIANTS FAILED:", str(e))
+        return {"image_thumb": None, "image_medium": None, "image_placeholder": ""}
+
+    return {
+        "image_thumb": SimpleUploadedFile(f"{name}_thumb.jpg", thumb, content_type="image/jpeg"),
+        "image_medium": SimpleUploadedFile(f"{name}_medium.jpg", medium, content_type="image/jpeg"),
+        "image_placeholder": placeholder,
+    }
@@ -1,29 +1,160 @@
+import hashlib
+import os
+import posixpath
+
+from django.conf import settings
+from django.core.exceptions import SuspiciousFileOperation
 from django.http import HttpResponse, Http404
+from django.utils.cache import get_conditional_response, patch_cache_control
+from django.utils.http import http_date, quote_etag
 from django.shortcuts import get_object_or_404, redirect
 from django.contrib.auth.decorators import login_required
 
+from applications.models import IDApplication
+
 from .models import IDCard
 from .services import ensure_id_card_exists
-from .generator import generate_id_card
+from .fingerprint import compute_fingerprint
+from .generator import current_render_inputs, generate_id_card, get_student_details
+from .encoders import sniff_image_type
+from .failover import current_failover_file, current_fingerprint, failover_rendered_at
+from .pdf import render_card_pdf
+from .sendfile import file_response
+from .storage import get_card_storage
 
 from django.shortcuts import render
 from django.http import Http404
 
 
 
+IMAGE_MAX_AGE = 300
+
+
+# =====================================================
+# HTTP CACHING (ETAG / LAST-MODIFIED / CACHE-CONTROL)
+# Validators come from everything a response shows: the
+# render fingerprint, the stored image, revocation and
+# expiry. Unchanged content gets a 304; any change to
+# the card changes the ETag immediately.
+# =====================================================
+def card_etag(id_card, *extra):
+    state = [
+        str(id_card.uid),
+        id_card.render_fingerprint or id_card.image_checksum or "",
+        str(getattr(id_card.image, "public_id", "") or ""),
+        str(getattr(id_card.image, "version", "") or ""),
+        str(id_card.is_active),
+        str(id_card.is_revoked),
+        id_card.revoked_reason or "",
+        id_card.expires_at.isoformat() if id_card.expires_at else "",
+        *map(str, extra),
+    ]
+    return quote_etag(hashlib.sha256("|".join(state).encode("utf-8")).hexdigest()[:32])
+
+
+def _conditional(request, etag, last_modified, build, **cache_control):
+    """
+    304 when the client's copy is current, else build(). Either
+    way the validators and Cache-Control are attached.
+    """
+    timestamp = int(last_modified.timestamp()) if last_modified else None
+
+    response = get_conditional_response(request, etag=etag, last_modified=timestamp)
+    if response is None:
+        response = build()
+
+    if request.method in ("GET", "HEAD") and response.status_code in (200, 302, 304):
+        response.headers.setdefault("ETag", etag)
+        if timestamp:
+            response.headers.setdefault("Last-Modified", http_date(timestamp))
+
+    patch_cache_control(response, **cache_control)
+    return response
+
+
+def _image_cache_control():
+    return {
+        "private": True,
+        "max_age": int(getattr(settings, "IDCARD_IMAGE_MAX_AGE", IMAGE_MAX_AGE)),
+    }
+
+
 # =====================================================
 # INTERNAL HELPER
 # Handles Cloudinary + Failover consistently
 # =====================================================
-def _serve_id_image(id_card, download=False):
+def _card_image_state(id_card):
+    """
+    Self-heal for the image views. Returns (fingerprint, spooled):
+    ("", None) once the card has a stored image, else the current
+    render fingerprint and the spooled failover file (or None).
+    A current spool file skips the heal: no blob load, no render.
+    """
+    if id_card.has_image:
+        return "", None
+
+    fingerprint = current_fingerprint(id_card)
+    spooled = current_failover_file(id_card, fingerprint)
+    if spooled:
+        return fingerprint, spooled
+
+    ensure_id_card_exists(id_card)
+    id_card.refresh_from_db()
+
+    if id_card.has_image:
+        return "", None
+
+    fingerprint = current_fingerprint(id_card)
+    return fingerprint, current_failover_file(id_card, fingerprint)
+
+
+def _serve_id_image(request, id_card, download=False):
+    """
+    Conditional wrapper around _build_image_response: a client
+    holding the current card gets a 304 without a render.
+
+    Without a stored image the card's tracking fields still describe
+    the last successful save, so failover and in-memory renders are
+    validated against the inputs they would be drawn from now.
+    """
+    fingerprint, spooled = _card_image_state(id_card)
+
+    if id_card.has_image:
+        last_modified = id_card.rendered_at
+    else:
+        fingerprint = fingerprint or compute_fingerprint({})
+        last_modified = failover_rendered_at(id_card, fingerprint)
+
+    return _conditional(
+        request,
+        card_etag(id_card, "download" if download else "inline", fingerprint),
+        last_modified,
+        lambda: _build_image_response(id_card, download, spooled),
+        **_image_cache_control(),
+    )
+
+
+def _build_image_response(id_card, download=False, spooled=None):
     """
     Unified image serving engine.
 
     Priority:
-    1. Cloudinary image (if valid)
-    2. Failover generated image (memory)
+    1. Stored image (local: streamed from disk, Cloudinary: redirect)
+    2. Stored failover image (spooled to disk, streamed)
+    3. Failover generated image (memory)
     """
 
+    # -------------------------------
+    # LOCAL STORAGE MODE (Streamed from disk)
+    # -------------------------------
+    storage = get_card_storage()
+
+    if id_card.has_image and not storage.remote:
+        try:
+            return _file_response(id_card, storage.path(id_card.image), download)
+        except FileNotFoundError:
+            raise Http404("ID Card image missing")
+
     # -------------------------------
     # CLOUDINARY MODE
     # -------------------------------
@@ -32,24 +163,40 @@ def _serve_id_image(id_card, download=False):
             return redirect(f"{id_card.image.url}?fl_attachment")
         return redirect(id_card.image.url)
 
+    # -------------------------------
+    # FAILOVER STORE (Spooled file, no render)
+    # -------------------------------
+    if spooled:
+        try:
+            return _file_response(id_card, spooled, download)
+        except FileNotFoundError:
+            pass
+
     # -------------------------------
     # FAILOVER MODE (Generate in-memory)
     # -------------------------------
     result = generate_id_card(id_card)
 
     if isinstance(result, (bytes, bytearray)):
-        response = HttpResponse(result, content_type="image/png")
+        content_type, extension = sniff_image_type(result)
+        response = HttpResponse(result, content_type=content_type)
 
         if download:
-            response["Content-Disposition"] = f'attachment; filename="ID-{id_card.uid}.png"'
+            response["Content-Disposition"] = f'attachment; filename="ID-{id_card.uid}.{extension}"'
         else:
-            response["Content-Disposition"] = "inline; filename=id_card.png"
+            response["Content-Disposition"] = f"inline; filename=id_card.{extension}"
 
         return response
 
     raise Http404("ID Card unavailable")
 
 
+def _file_response(id_card, path, download=False):
+    extension = os.path.splitext(path)[1].lstrip(".") or "png"
+    filename = f"ID-{id_card.uid}.{extension}" if download else f"id_card.{extension}"
+    return file_response(path, filename=filename, as_attachment=download)
+
+
 # =====================================================
 # VERIFY ID (Public via QR)
 # =====================================================
@@ -57,25 +204,29 @@ def _serve_id_image(id_card, download=False):
 def verify_id(request, uid, token=None):
     id_card = get_object_or_404(IDCard, uid=uid)
 
+    # Every verify answer is revalidated: a revocation shows at once
+    def no_cache(response):
+        patch_cache_control(response, no_cache=True, private=True)
+        return response
+
     # If secure token exists ? enforce validation
     if id_card.verify_token:
         if not token or token != id_card.verify_token:
-            return render(request, "idcards/verify_invalid.html", {"valid": False})
+            return no_cache(render(request, "idcards/verify_invalid.html", {"valid": False}))
 
     # revoked / disabled
     if not id_card.is_active or id_card.is_revoked:
-        return render(request, "idcards/verify_revoked.html", {
+        return no_cache(render(request, "idcards/verify_revoked.html", {
             "reason": id_card.revoked_reason
-        })
+        }))
 
     if id_card.is_expired():
-        return render(request, "idcards/verify_invalid.html", {
+        return no_cache(render(request, "idcards/verify_invalid.html", {
             "valid": False,
             "reason": "Expired"
-        })
+        }))
 
-    ensure_id_card_exists(id_card)
-    id_card.refresh_from_db()
+    _card_image_state(id_card)
 
     student = id_card.student
 
@@ -87,13 +238,21 @@ def verify_id(request, uid, token=None):
     else:
         image_stream_url = f"/idcards/stream/{id_card.uid}/"
 
-    return render(request, "idcards/verify.html", {
-        "valid": True,
-        "student": student,
-        "id_card": id_card,
-        "image_url": image_url,
-        "image_stream_url": image_stream_url,
-    })
+    return _conditional(
+        request,
+        card_etag(id_card, "verify", *get_student_details(student)),
+        None,
+        lambda: render(request, "idcards/verify.html", {
+            "valid": True,
+            "student": student,
+            "id_card": id_card,
+            "image_url": image_url,
+            "image_srcset": id_card.image_srcset,
+            "image_stream_url": image_stream_url,
+        }),
+        no_cache=True,
+        private=True,
+    )
 
     # -------------------------------------------------
     # SELF-HEAL (Rebuild missing image automatically)
@@ -140,10 +299,7 @@ def verify_id(request, uid, token=None):
 def download_id(request, uid):
     id_card = get_object_or_404(IDCard, uid=uid)
 
-    ensure_id_card_exists(id_card)
-    id_card.refresh_from_db()
-
-    return _serve_id_image(id_card, download=True)
+    return _serve_id_image(request, id_card, download=True)
 
 
 # =====================================================
@@ -167,10 +323,7 @@ def view_id_card(request, uid=None):
 
         id_card = student.id_card
 
-    ensure_id_card_exists(id_card)
-    id_card.refresh_from_db()
-
-    return _serve_id_image(id_card, download=False)
+    return _serve_id_image(request, id_card, download=False)
 
 # =====================================================
 # STREAM DOWNLOAD (Explicit Failover Download)
@@ -178,7 +331,97 @@ def view_id_card(request, uid=None):
 def download_id_stream(request, uid):
     id_card = get_object_or_404(IDCard, uid=uid)
 
-    ensure_id_card_exists(id_card)
-    id_card.refresh_from_db()
+    return _serve_id_image(request, id_card, download=True)
+
+
+# =====================================================
+# PRINT PDF (Vector CR80, rendered in memory)
+# =====================================================
+@login_required
+def download_id_pdf(request, uid):
+    id_card = get_object_or_404(IDCard, uid=uid)
+
+    if not id_card.is_active or id_card.is_revoked:
+        raise Http404("ID Card unavailable")
+
+    def build():
+        data = render_card_pdf(id_card)
+        if not data:
+            raise Http404("ID Card unavailable")
+
+        response = HttpResponse(data, content_type="application/pdf")
+        response["Content-Disposition"] = f'attachment; filename="ID-{id_card.uid}.pdf"'
+        return response
+
+    return _conditional(
+        request,
+        # Rendered live: validate against what it would be drawn from now
+        card_etag(id_card, "pdf", compute_fingerprint(current_render_inputs(id_card) or {})),
+        id_card.rendered_at,
+        build,
+        **_image_cache_control(),
+    )
+
+
+# =====================================================
+# LOCAL CARD STORAGE (IDCARD_STORAGE_BACKEND = "local")
+# Serves what idcards.storage.LocalCardStorage.url points at.
+# Card images are public (the verify page shows them to
+# anyone with the QR link); everything else, i.e. passport
+# uploads and their derivatives, only to staff and the
+# student who owns it.
+# =====================================================
+PUBLIC_STORAGE_FOLDERS = ("idcards/",)
+
+
+def _owns_stored(user, name):
+    student = getattr(user, "student", None)
+    if student is None:
+        return False
+
+    resources = []
+
+    application = IDApplication.objects.filter(student=student).only(
+        "passport", "passport_card", "passport_thumb"
+    ).first()
+    if application:
+        resources += [application.passport, application.passport_card, application.passport_thumb]
+
+    id_card = IDCard.objects.filter(student=student).only("passport").first()
+    if id_card:
+        resources.append(id_card.passport)
+
+    public_id = posixpath.splitext(name)[0]
+    return any(getattr(resource, "public_id", None) == public_id for resource in resources)
+
+
+def _may_read_stored(user, name):
+    if name.startswith(PUBLIC_STORAGE_FOLDERS):
+        return True
+
+    if not user.is_authenticated:
+        return False
+
+    return user.is_staff or _owns_stored(user, name)
+
+
+def serve_stored(request, name):
+    storage = get_card_storage()
+
+    if storage.remote:
+        raise Http404("Not stored locally")
+
+    # Folder checks need the canonical name ("idcards/../x" is not a card)
+    name = posixpath.normpath(name)
+    if name.startswith(("..", "/")) or not _may_read_stored(request.user, name):
+        raise Http404("Not found")
+
+    try:
+        response = file_response(storage.files.path(name))
+    except (SuspiciousFileOperation, FileNotFoundError):
+        raise Http404("Not found")
+
+    if not name.startswith(PUBLIC_STORAGE_FOLDERS):
+        patch_cache_control(response, private=True)
 
-    return _serve_id_image(id_card, download=True)
+    return response
@@ -8,7 +8,8 @@ from django.db import transaction, IntegrityError
 
 from students.models import Student
 from applications.models import IDApplication
-from idcards.services import generate_id_card
+from idcards.models import IDCard
+from idcards.generator import render_many, RENDER_ERROR
 
 User = get_user_model()
 
@@ -31,6 +32,7 @@ class Command(BaseCommand):
             return
 
         created = updated = healed_users = healed_students = rebuilt = skipped = failed = 0
+        rebuild_student_ids = []
 
         with csv_path.open(encoding="utf-8-sig", newline="") as f:
             reader = csv.reader(f)
@@ -141,14 +143,14 @@ class Command(BaseCommand):
                             updated += 1
 
                     # -------------------------------------------------
-                    # 5. OPTIONAL ID REBUILD
+                    # 5. OPTIONAL ID REBUILD (QUEUED FOR BATCH RENDER)
                     # -------------------------------------------------
                     if FORCE_REBUILD and student:
                         try:
                             app = IDApplication.objects.filter(student=student).first()
                             if app and app.passport:
                                 if not DRY_RUN:
-                                    generate_id_card(app)
+                                    rebuild_student_ids.append(student.id)
                                 rebuilt += 1
                         except Exception:
                             pass
@@ -159,6 +161,12 @@ class Command(BaseCommand):
                     failed += 1
                     self.stderr.write(f"FAILED {matric}: {repr(e)}")
 
+        # -------------------------------------------------
+        # 6. BATCH ID REBUILD (ALL CORES)
+        # -------------------------------------------------
+        if rebuild_student_ids:
+            rebuilt, failed = self.rebuild_id_cards(rebuild_student_ids, rebuilt, failed)
+
         self.stdout.write(
             self.style.SUCCESS(
                 f"""
@@ -174,3 +182,22 @@ Failed: {failed}
 """
             )
         )
+
+    def rebuild_id_cards(self, student_ids, rebuilt, failed):
+        approved = IDApplication.objects.filter(
+            student_id__in=student_ids,
+            status=IDApplication.STATUS_APPROVED,
+        ).select_related("student")
+
+        card_ids = []
+        for app in approved:
+            card, _ = IDCard.objects.get_or_create(student=app.student)
+            card_ids.append(card.pk)
+
+        for result in render_many(card_ids):
+            if result["status"] == RENDER_ERROR:
+                rebuilt -= 1
+                failed += 1
+                self.stderr.write(f"FAILED ID card {result['id']}: {result['error']}")
+
+        return rebuilt, failed